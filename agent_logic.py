@@ -1,22 +1,23 @@
 # agent_logic.py
-import os
+import asyncio
+import threading
+from datetime import datetime
 from dotenv import load_dotenv
 load_dotenv()
 
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.prebuilt import create_react_agent
 import tools
+from fetch_engine import fetch_concurrently
+from llm_metrics import llm_metrics, new_cycle_id
+from analytics_logger import log_decision_analytics
+from trading_config import DEFAULT_WATCHLIST, AGENT_PARAMS
 
-# Alpaca setup
-from alpaca.trading.client import TradingClient
+# Alpaca setup (shared, pooled client for the whole process)
+from broker_client import get_trading_client
 
 try:
-    api_key = os.environ.get('APCA_API_KEY_ID')
-    secret_key = os.environ.get('APCA_API_SECRET_KEY')
-    if api_key and secret_key:
-        tools.trading_client = TradingClient(api_key, secret_key, paper=True)
-        print("✅ Alpaca client initialized")
-    else:
+    if not get_trading_client():
         print("❌ Alpaca keys missing")
 except Exception as e:
     print(f"❌ Alpaca init error: {e}")
@@ -31,11 +32,51 @@ trading_tools = [
     tools.place_market_order,
 ]
 
-def run_paper_trading_agent_cycle(ticker: str) -> str:
-    """Runs one trading cycle for a single stock - AGGRESSIVE VERSION"""
+# Compiled once and shared by every cycle (the graph holds no per-run state)
+agent_executor = create_react_agent(llm, trading_tools)
+
+# Pre-fetched context mode: price, news and holdings go into the prompt, so
+# the model only needs a tool to act
+prefetch_agent_executor = create_react_agent(llm, [tools.place_market_order])
+
+def gather_ticker_context(ticker: str, handler=None) -> dict:
+    """Fetch price, news summary and holdings for a ticker in parallel;
+    the news summary's LLM call is reported to handler when given"""
+    news_config = {"callbacks": [handler]} if handler else None
+    lookups = {
+        "price": lambda: tools.get_current_price.invoke({"ticker": ticker}),
+        "news": lambda: tools.summarize_company_news(ticker, news_config),
+        "holdings": lambda: tools.get_asset_holdings.invoke({"ticker": ticker}),
+    }
+    # The news lookup includes an LLM summary, so allow more than a data request
+    found, errors = fetch_concurrently(
+        lambda name: lookups[name](),
+        list(lookups),
+        max_workers=len(lookups),
+        timeout=AGENT_PARAMS["context_timeout_seconds"]
+    )
+    for name, e in errors.items():
+        found[name] = f"Error getting {name}: {e}"
+    return found
+
+# Shared by both agent modes so their decision rules never drift apart
+TRADING_RULES = """
+    **TRADING RULES - BE DECISIVE:**
+    - If there's ANY positive news → BUY 1 share (unless we already hold it)
+    - If there's ANY negative news → SELL 1 share (if we hold it)  
+    - If news is mixed/neutral → BUY 1 share (momentum play)
+    - Only HOLD if there's absolutely NO news available
     
-    print(f"🔍 Analyzing {ticker}...")
+    **CRITICAL: YOU MUST USE place_market_order TOOL WHEN DECIDING TO BUY OR SELL**
+    Don't just analyze - TAKE ACTION. Execute trades!
+    
+    Remember: This is PAPER TRADING - no real money at risk.
+    Be bold and make trading decisions.
     
+    After executing (or deciding not to), provide a brief summary.
+    """
+
+def _build_prompt(ticker: str) -> str:
     # VERY AGGRESSIVE PROMPT - Forces action
     prompt = f"""
     You are an AGGRESSIVE trading bot that MUST take action. You are trading {ticker}.
@@ -46,34 +87,151 @@ def run_paper_trading_agent_cycle(ticker: str) -> str:
     3. Check if we hold {ticker}
     4. MAKE A FIRM DECISION: BUY, SELL, or HOLD
     5. EXECUTE the decision immediately if appropriate
+    {TRADING_RULES}"""
+    return prompt
+
+def _build_prefetched_prompt(ticker: str, context: dict) -> str:
+    # Same rules as _build_prompt, with the research already done
+    prompt = f"""
+    You are an AGGRESSIVE trading bot that MUST take action. You are trading {ticker}.
     
-    **TRADING RULES - BE DECISIVE:**
-    - If there's ANY positive news → BUY 1 share (unless we already hold it)
-    - If there's ANY negative news → SELL 1 share (if we hold it)  
-    - If news is mixed/neutral → BUY 1 share (momentum play)
-    - Only HOLD if there's absolutely NO news available
-    
-    **CRITICAL: YOU MUST USE place_market_order TOOL WHEN DECIDING TO BUY OR SELL**
-    Don't just analyze - TAKE ACTION. Execute trades!
+    **CURRENT DATA (already fetched - do not ask for it):**
+    - Current price: {context['price']}
+    - Holdings: {context['holdings']}
+    - Recent news: {context['news']}
     
-    Remember: This is PAPER TRADING - no real money at risk.
-    Be bold and make trading decisions.
+    MAKE A FIRM DECISION: BUY, SELL, or HOLD, and EXECUTE it immediately if appropriate.
+    {TRADING_RULES}"""
+    return prompt
+
+def _agent_request(ticker: str, prefetch: bool, context: dict = None, handler=None):
+    """(executor, input) for one cycle in the chosen mode"""
+    if prefetch:
+        prompt = _build_prefetched_prompt(ticker, context or gather_ticker_context(ticker, handler))
+        return prefetch_agent_executor, {"messages": [("user", prompt)]}
+    return agent_executor, {"messages": [("user", _build_prompt(ticker))]}
+
+def _executed_action(messages) -> str:
+    """BUY/SELL of the last order the agent actually placed, else HOLD.
+
+    An order counts only if its place_market_order result reports success,
+    so a rejected order is not logged as a trade.
+    """
+    results = {
+        message.tool_call_id: str(message.content)
+        for message in messages if getattr(message, "tool_call_id", None)
+    }
+    action = "HOLD"
+    for message in messages:
+        for call in getattr(message, "tool_calls", None) or []:
+            if (call.get('name') == "place_market_order" and call.get('args', {}).get('side')
+                    and results.get(call.get('id'), "").startswith("✅")):
+                action = str(call['args']['side']).upper()
+    return action
+
+def _log_agent_decision(ticker: str, messages, handler, prefetch: bool):
+    """Record the agent's action (from its successful orders) with LLM metrics"""
+    final_output = messages[-1].content
+    action = _executed_action(messages)
+    log_decision_analytics({
+        'timestamp': datetime.now().isoformat(),
+        'ticker': ticker,
+        'action': action,
+        'confidence': "N/A",
+        'reason': final_output[:300],
+        'mode': 'agent_prefetch' if prefetch else 'agent',
+        'llm': llm_metrics.finish(handler),
+    })
+
+def run_paper_trading_agent_cycle(ticker: str, prefetch: bool = None, cycle_id: str = None) -> str:
+    """Runs one trading cycle for a single stock - AGGRESSIVE VERSION.
     
-    After executing (or deciding not to), provide a brief summary.
+    With prefetch (off unless AGENT_PARAMS["prefetch_context"] is set),
+    market context is gathered up front and the agent only decides and
+    places the order.
     """
+    prefetch = AGENT_PARAMS["prefetch_context"] if prefetch is None else prefetch
+    handler = llm_metrics.handler(ticker=ticker, cycle_id=cycle_id or new_cycle_id())
+    
+    print(f"🔍 Analyzing {ticker}...")
     
     try:
-        agent_executor = create_react_agent(llm, trading_tools)
-        result = agent_executor.invoke({"messages": [("user", prompt)]})
+        executor, request = _agent_request(ticker, prefetch, handler=handler)
+        result = executor.invoke(request, config={"callbacks": [handler]})
         final_output = result['messages'][-1].content
         print(f"🤖 Agent decision: {final_output[:200]}...")
+        _log_agent_decision(ticker, result['messages'], handler, prefetch)
         return final_output
         
     except Exception as e:
+        llm_metrics.finish(handler)
         error_msg = f"❌ Trading cycle failed: {str(e)}"
         print(error_msg)
         return error_msg
 
+async def _arun_agent(ticker: str, prefetch: bool, handler):
+    context = await asyncio.to_thread(gather_ticker_context, ticker, handler) if prefetch else None
+    executor, request = _agent_request(ticker, prefetch, context)
+    return await executor.ainvoke(request, config={"callbacks": [handler]})
+
+async def arun_paper_trading_agent_cycle(ticker: str, semaphore: asyncio.Semaphore = None, timeout: float = None,
+                                         prefetch: bool = None, cycle_id: str = None) -> str:
+    """Async version of run_paper_trading_agent_cycle with an optional
+    concurrency limit and per-ticker timeout"""
+    timeout = timeout or AGENT_PARAMS["ticker_timeout_seconds"]
+    semaphore = semaphore or asyncio.Semaphore(1)
+    prefetch = AGENT_PARAMS["prefetch_context"] if prefetch is None else prefetch
+    handler = llm_metrics.handler(ticker=ticker, cycle_id=cycle_id or new_cycle_id())
+    
+    async with semaphore:
+        print(f"🔍 Analyzing {ticker}...")
+        try:
+            result = await asyncio.wait_for(_arun_agent(ticker, prefetch, handler), timeout=timeout)
+            final_output = result['messages'][-1].content
+            print(f"🤖 {ticker} decision: {final_output[:200]}...")
+            _log_agent_decision(ticker, result['messages'], handler, prefetch)
+            return final_output
+            
+        except asyncio.TimeoutError:
+            error_msg = f"❌ Trading cycle for {ticker} timed out after {timeout}s"
+        except Exception as e:
+            error_msg = f"❌ Trading cycle failed: {str(e)}"
+        llm_metrics.finish(handler)
+        print(error_msg)
+        return error_msg
+
+async def arun_watchlist_cycles(tickers=None, max_concurrency: int = None, timeout: float = None,
+                                prefetch: bool = None) -> dict:
+    """Run agent cycles for every ticker concurrently; returns ticker -> output"""
+    tickers = list(dict.fromkeys(tickers or DEFAULT_WATCHLIST))
+    semaphore = asyncio.Semaphore(max_concurrency or AGENT_PARAMS["max_concurrent_llm_calls"])
+    cycle_id = new_cycle_id()
+    outputs = await asyncio.gather(*(
+        arun_paper_trading_agent_cycle(ticker, semaphore, timeout, prefetch, cycle_id) for ticker in tickers
+    ))
+    return dict(zip(tickers, outputs))
+
+# One long-lived event loop for blocking callers, so the async LLM client
+# and its connections are reused across calls instead of tied to a dead loop
+_event_loop = None
+_event_loop_lock = threading.Lock()
+
+def _get_event_loop():
+    global _event_loop
+    with _event_loop_lock:
+        if _event_loop is None:
+            _event_loop = asyncio.new_event_loop()
+            threading.Thread(target=_event_loop.run_forever, name="agent-event-loop", daemon=True).start()
+    return _event_loop
+
+def run_watchlist_cycles(tickers=None, max_concurrency: int = None, timeout: float = None,
+                         prefetch: bool = None) -> dict:
+    """Blocking wrapper around arun_watchlist_cycles (for Streamlit and scripts)"""
+    future = asyncio.run_coroutine_threadsafe(
+        arun_watchlist_cycles(tickers, max_concurrency, timeout, prefetch), _get_event_loop()
+    )
+    return future.result()
+
 def get_current_portfolio_summary() -> dict:
     """Gets portfolio summary for the UI."""
     return tools.get_portfolio_summary()
\ No newline at end of file
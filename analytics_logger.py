@@ -1,9 +1,36 @@
 # analytics_logger.py
 import json
 import os
+import threading
 from datetime import datetime
 import pandas as pd
 
+# Trades and decisions are logged from several threads (entry batches, the
+# position monitor, concurrent agent cycles); serialize the read-modify-write
+_log_lock = threading.Lock()
+
+def _append_log(path, record, keep):
+    """Append a record to a JSON list file, keeping the last `keep` entries"""
+    with _log_lock:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        records = []
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    records = json.load(f)
+            except ValueError as e:
+                print(f"❌ Unreadable log {path}, starting a new one: {e}")
+        
+        records.append(record)
+        records = records[-keep:]
+        
+        # Write-then-rename so readers never see a partial file
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(records, f, indent=2, default=str)
+        os.replace(tmp_path, path)
+
 def log_trade_execution(ticker: str, action: str, shares: int, price: float, result: str):
     """Log detailed trade execution for analytics."""
     
@@ -18,27 +45,7 @@ def log_trade_execution(ticker: str, action: str, shares: int, price: float, res
         'pnl': calculate_trade_pnl(ticker, action, shares, price)
     }
     
-    # Ensure directory exists
-    os.makedirs('trading_logs', exist_ok=True)
-    
-    # Load existing trades
-    trades_file = 'trading_logs/trades.json'
-    if os.path.exists(trades_file):
-        with open(trades_file, 'r') as f:
-            trades = json.load(f)
-    else:
-        trades = []
-    
-    # Add new trade
-    trades.append(trade_data)
-    
-    # Keep only last 1000 trades
-    if len(trades) > 1000:
-        trades = trades[-1000:]
-    
-    # Save updated trades
-    with open(trades_file, 'w') as f:
-        json.dump(trades, f, indent=2)
+    _append_log('trading_logs/trades.json', trade_data, keep=1000)
 
 def calculate_trade_pnl(ticker: str, action: str, shares: int, price: float) -> float:
     """Calculate P&L for a trade (simplified version)."""
@@ -55,27 +62,7 @@ def calculate_trade_pnl(ticker: str, action: str, shares: int, price: float) ->
 def log_decision_analytics(decision_data: dict):
     """Enhanced decision logging for analytics."""
     
-    # Ensure directory exists
-    os.makedirs('trading_logs', exist_ok=True)
-    
-    # Load existing decisions
-    decisions_file = 'trading_logs/decisions.json'
-    if os.path.exists(decisions_file):
-        with open(decisions_file, 'r') as f:
-            decisions = json.load(f)
-    else:
-        decisions = []
-    
-    # Add new decision
-    decisions.append(decision_data)
-    
-    # Keep only last 2000 decisions
-    if len(decisions) > 2000:
-        decisions = decisions[-2000:]
-    
-    # Save updated decisions
-    with open(decisions_file, 'w') as f:
-        json.dump(decisions, f, indent=2)
+    _append_log('trading_logs/decisions.json', decision_data, keep=2000)
 
 def get_analytics_data() -> dict:
     """Load analytics data from logs."""
@@ -1,26 +1,29 @@
 # hft_scalper.py
-import os
 import time
+import threading
 import pandas as pd
-import yfinance as yf
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from types import MappingProxyType
 from dotenv import load_dotenv
 load_dotenv()
 
 import tools
+from market_data import get_bars, fetch_bars_batch, get_provider
+from fetch_engine import fetch_concurrently
+from indicators import IndicatorBook
+from order_router import submit_orders, get_order_latency_stats, lookup_order
+from watchlist_refresher import watchlist_refresher
+from trading_config import ORDER_PARAMS, WATCHLIST_PARAMS
 from momentum_scanner import get_dynamic_watchlist
 from analytics_logger import log_trade_execution, log_decision_analytics
 
-# Alpaca setup
-from alpaca.trading.client import TradingClient
+# Alpaca setup (shared, pooled client for the whole process)
+from broker_client import get_trading_client
+from fill_tracker import fill_tracker
 
 try:
-    api_key = os.environ.get('APCA_API_KEY_ID')
-    secret_key = os.environ.get('APCA_API_SECRET_KEY')
-    if api_key and secret_key:
-        tools.trading_client = TradingClient(api_key, secret_key, paper=True)
-        print("✅ Alpaca client initialized for HFT trading")
-    else:
+    if not get_trading_client():
         print("❌ Alpaca keys missing")
 except Exception as e:
     print(f"❌ Alpaca init error: {e}")
@@ -35,22 +38,33 @@ HFT_PARAMS = {
     "max_daily_trades": 30,            # High frequency
 }
 
+# Streaming indicator state for 2-minute bars (5-bar volume average)
+price_indicators = IndicatorBook(volume_window=5)
+
 # Track active positions
 active_positions = {}
+pending_exits = {}  # client_order_id -> (entry_price, shares) for sells awaiting their fill
+unconfirmed_orders = {}  # client_order_id -> trade for timed-out submissions the broker hasn't confirmed
+# Guards active_positions/daily_trades: exits, entry submissions and fill
+# events update them from different threads
+_book_lock = threading.RLock()
 daily_trades = {
     "date": datetime.now().date(),
     "trades_count": 0,
-    "last_trade_time": None
+    "last_trade_time": None,
+    "realized_pnl": 0.0
 }
 
 def reset_daily_trades():
     """Reset daily trade counter if new day"""
     today = datetime.now().date()
-    if daily_trades["date"] != today:
-        daily_trades["date"] = today
-        daily_trades["trades_count"] = 0
-        daily_trades["last_trade_time"] = None
-        active_positions.clear()
+    with _book_lock:
+        if daily_trades["date"] != today:
+            daily_trades["date"] = today
+            daily_trades["trades_count"] = 0
+            daily_trades["last_trade_time"] = None
+            daily_trades["realized_pnl"] = 0.0
+            active_positions.clear()
 
 def calculate_position_size():
     """Calculate 10% position size"""
@@ -62,38 +76,57 @@ def calculate_position_size():
     position_size = portfolio_value * (HFT_PARAMS["position_size_pct"] / 100)
     return max(100, position_size)  # Minimum $100
 
+def _price_movement_from_bars(ticker, hist):
+    """Compute scalping signal inputs from a 2-minute bar frame"""
+    if len(hist) < 5:
+        return None
+    
+    # Only bars newer than the last update are processed
+    state = price_indicators.update(ticker, hist)
+    change_pct = state['change_pct'] or 0.0
+    
+    return {
+        'ticker': ticker,
+        'price': state['price'],
+        'change_pct': change_pct,
+        'volume_ratio': state['volume_ratio'],
+        'trend': 'up' if change_pct > 0 else 'down'
+    }
+
 def get_price_movement(ticker):
     """Get recent price movement for scalping signals"""
     try:
-        stock = yf.Ticker(ticker)
-        hist = stock.history(period="1d", interval="2m")
-        
-        if len(hist) < 5:
-            return None
-            
-        current_price = hist['Close'].iloc[-1]
-        prev_price = hist['Close'].iloc[-2]
-        change_pct = ((current_price - prev_price) / prev_price) * 100
-        
-        # Volume analysis
-        current_volume = hist['Volume'].iloc[-1]
-        avg_volume = hist['Volume'].tail(5).mean()
-        volume_ratio = current_volume / avg_volume if avg_volume > 0 else 1
-        
-        return {
-            'ticker': ticker,
-            'price': current_price,
-            'change_pct': change_pct,
-            'volume_ratio': volume_ratio,
-            'trend': 'up' if change_pct > 0 else 'down'
-        }
+        hist = get_bars(ticker, period="1d", interval="2m")
+        return _price_movement_from_bars(ticker, hist)
     except Exception as e:
         print(f"❌ Price analysis failed for {ticker}: {e}")
         return None
 
-def should_buy_stock(ticker):
+def build_market_snapshot(tickers):
+    """Build a read-only price-movement snapshot for one cycle.
+    
+    All tickers are fetched in one batch; signals, sizing and exits then read
+    from the same data, so the entry decision and the order price agree.
+    """
+    bars = fetch_bars_batch(tickers, period="1d", interval="2m")
+    snapshot = {}
+    
+    for ticker, hist in bars.items():
+        try:
+            price_data = _price_movement_from_bars(ticker, hist)
+            if price_data:
+                snapshot[ticker] = MappingProxyType(price_data)
+        except Exception as e:
+            print(f"❌ Price analysis failed for {ticker}: {e}")
+    
+    return MappingProxyType(snapshot)
+
+def should_buy_stock(ticker, snapshot=None):
     """HFT Buy Signal: Buy on small dips or momentum"""
-    price_data = get_price_movement(ticker)
+    if snapshot is not None:
+        price_data = snapshot.get(ticker)
+    else:
+        price_data = get_price_movement(ticker)
     if not price_data:
         return False
     
@@ -106,157 +139,377 @@ def should_buy_stock(ticker):
     
     return any(buy_signals)
 
-def manage_active_positions():
+def evaluate_exit(ticker, position, current_price, now=None):
+    """Apply the HFT exit rules to one position at the given price.
+    
+    Returns an exit dict, or None to keep holding.
+    """
+    entry_price = position['entry_price']
+    
+    # Calculate P/L
+    profit_pct = ((current_price - entry_price) / entry_price) * 100
+    hold_time = ((now or datetime.now()) - position['entry_time']).total_seconds() / 60  # minutes
+    
+    # Exit signals
+    exit_reason = None
+    if profit_pct >= HFT_PARAMS["profit_target_pct"]:
+        exit_reason = f"Profit target: +{profit_pct:.2f}%"
+    elif profit_pct <= -HFT_PARAMS["stop_loss_pct"]:
+        exit_reason = f"Stop loss: {profit_pct:.2f}%"
+    elif hold_time >= HFT_PARAMS["max_hold_minutes"]:
+        exit_reason = f"Time limit: {hold_time:.1f}min"
+    
+    if not exit_reason:
+        return None
+    return {
+        'ticker': ticker,
+        'entry_price': entry_price,
+        'current_price': current_price,
+        'profit_pct': profit_pct,
+        'reason': exit_reason,
+        'shares': position['shares']
+    }
+
+def claim_exit(ticker):
+    """Mark a position as exiting; False if another loop already claimed it"""
+    with _book_lock:
+        position = active_positions.get(ticker)
+        if not position or position.get('exiting'):
+            return False
+        position['exiting'] = True
+        return True
+
+def manage_active_positions(snapshot=None):
     """Check all active positions for exit signals"""
     exits = []
     
-    for ticker, position in list(active_positions.items()):
+    # Fills and the position monitor change the book from other threads
+    with _book_lock:
+        held = {ticker: dict(position) for ticker, position in active_positions.items()}
+    
+    if snapshot is None:
+        # No cycle snapshot: fetch all held tickers in parallel
+        snapshot, _ = fetch_concurrently(get_price_movement, list(held), provider=get_provider().name)
+    
+    for ticker, position in held.items():
         try:
-            current_data = get_price_movement(ticker)
-            if not current_data:
+            current_data = snapshot.get(ticker)
+            if not current_data or position.get('exiting'):
                 continue
-                
-            current_price = current_data['price']
-            entry_price = position['entry_price']
-            entry_time = position['entry_time']
-            
-            # Calculate P/L
-            profit_pct = ((current_price - entry_price) / entry_price) * 100
-            hold_time = (datetime.now() - entry_time).total_seconds() / 60  # minutes
-            
-            # Exit signals
-            exit_reason = None
-            if profit_pct >= HFT_PARAMS["profit_target_pct"]:
-                exit_reason = f"Profit target: +{profit_pct:.2f}%"
-            elif profit_pct <= -HFT_PARAMS["stop_loss_pct"]:
-                exit_reason = f"Stop loss: {profit_pct:.2f}%"
-            elif hold_time >= HFT_PARAMS["max_hold_minutes"]:
-                exit_reason = f"Time limit: {hold_time:.1f}min"
             
-            if exit_reason:
-                exits.append({
-                    'ticker': ticker,
-                    'entry_price': entry_price,
-                    'current_price': current_price,
-                    'profit_pct': profit_pct,
-                    'reason': exit_reason,
-                    'shares': position['shares']
-                })
+            exit_trade = evaluate_exit(ticker, position, current_data['price'])
+            if exit_trade:
+                exits.append(exit_trade)
                 
         except Exception as e:
             print(f"❌ Error managing position {ticker}: {e}")
     
     return exits
 
-def execute_hft_trade(ticker, action, shares, price, reason=""):
-    """Execute HFT trade with aggressive sizing"""
+def _book_exit(entry_price, shares, fill):
+    pnl = (fill['filled_avg_price'] - entry_price) * shares
+    daily_trades["realized_pnl"] += pnl
+    print(f"💰 Realized {fill['symbol']}: ${pnl:+.2f} @ ${fill['filled_avg_price']:.2f}")
+
+def _on_fill(update, fill):
+    """Replace estimated prices with actual fills as trade updates arrive"""
+    client_order_id = update.order.client_order_id
+    with _book_lock:
+        trade = unconfirmed_orders.pop(client_order_id, None)
+        if trade is None:
+            _apply_fill_to_positions(client_order_id, fill)
+            return
+        # A submission that timed out did reach the broker
+        _book_submission(trade, client_order_id, fill)
+    _log_trade(trade, fill['filled_avg_price'], f"✅ {trade['action']} order confirmed after timeout: {client_order_id}")
+
+def _apply_fill_to_positions(client_order_id, fill):
+    if fill['side'] == "buy":
+        position = active_positions.get(fill['symbol'])
+        if position and position.get('client_order_id') == client_order_id:
+            position['entry_price'] = fill['filled_avg_price']
+            position['filled'] = fill['complete']
+    elif fill['complete'] and client_order_id in pending_exits:
+        entry_price, shares = pending_exits.pop(client_order_id)
+        _book_exit(entry_price, shares, fill)
+
+fill_tracker.add_listener(_on_fill)
+
+def _book_submission(trade, client_order_id, fill):
+    """Book an order the broker has (caller holds _book_lock); fill is None
+    until one arrives, and _on_fill applies it then"""
+    ticker = trade['ticker']
+    if trade['action'] == "BUY":
+        # Track active position
+        active_positions[ticker] = {
+            'entry_price': fill['filled_avg_price'] if fill else trade['price'],
+            'shares': trade['shares'],
+            'entry_time': datetime.now(),
+            'reason': trade.get('reason', ''),
+            'client_order_id': client_order_id,
+            'filled': bool(fill and fill['complete'])
+        }
+    elif trade['action'] == "SELL":
+        # Remove from active positions
+        position = active_positions.pop(ticker, None)
+        if position:
+            if fill and fill['complete']:
+                _book_exit(position['entry_price'], trade['shares'], fill)
+            else:
+                pending_exits[client_order_id] = (position['entry_price'], trade['shares'])
+    
+    daily_trades["trades_count"] += 1
+    daily_trades["last_trade_time"] = datetime.now()
+
+def _log_trade(trade, price, result):
+    # Logging must never lose track of orders that are already at the broker
     try:
-        if action == "BUY":
-            result = tools.place_market_order.func(ticker, shares, "buy")
-            
-            # Track active position
-            active_positions[ticker] = {
-                'entry_price': price,
-                'shares': shares,
-                'entry_time': datetime.now(),
-                'reason': reason
-            }
+        log_trade_execution(trade['ticker'], trade['action'], trade['shares'], price, result)
+    except Exception as e:
+        print(f"❌ Trade log error for {trade['ticker']}: {e}")
+
+def _drop_unconfirmed(client_order_id, why):
+    """Forget a timed-out order the broker never took (caller holds _book_lock)"""
+    trade = unconfirmed_orders.pop(client_order_id)
+    if trade['action'] == "SELL":
+        # Let the next check retry the exit
+        active_positions.get(trade['ticker'], {}).pop('exiting', None)
+    print(f"⚠️ Dropping unconfirmed {trade['action']} {trade['ticker']}: {why}")
+
+def _resolve_unconfirmed_orders():
+    """Settle timed-out submissions by looking them up at the broker"""
+    with _book_lock:
+        unresolved = dict(unconfirmed_orders)
+    
+    for client_order_id, trade in unresolved.items():
+        order = lookup_order(client_order_id)
+        confirmed = None
+        with _book_lock:
+            if unconfirmed_orders.get(client_order_id) is not trade:
+                continue  # A fill settled it meanwhile
+            if order is None:
+                if time.time() - trade['submitted_at'] >= ORDER_PARAMS["unconfirmed_giveup_seconds"]:
+                    _drop_unconfirmed(client_order_id, "not found at the broker")
+                continue
             
-        elif action == "SELL":
-            result = tools.place_market_order.func(ticker, shares, "sell")
+            status = str(getattr(order.status, "value", order.status))
+            if status in ("canceled", "rejected", "expired"):
+                _drop_unconfirmed(client_order_id, f"order {status}")
+                continue
             
-            # Remove from active positions
-            if ticker in active_positions:
-                del active_positions[ticker]
-        
-        daily_trades["trades_count"] += 1
-        daily_trades["last_trade_time"] = datetime.now()
-        
-        log_trade_execution(ticker, action, shares, price, result)
-        return {"executed": True, "result": result}
-        
-    except Exception as e:
-        return {"executed": False, "error": str(e)}
+            unconfirmed_orders.pop(client_order_id)
+            fill = None
+            if float(order.filled_qty or 0) > 0:
+                fill = {
+                    'symbol': trade['ticker'],
+                    'side': trade['action'].lower(),
+                    'filled_qty': float(order.filled_qty),
+                    'filled_avg_price': float(order.filled_avg_price),
+                    'complete': status == "filled",
+                }
+            _book_submission(trade, client_order_id, fill)
+            confirmed = fill['filled_avg_price'] if fill else trade['price']
+        _log_trade(trade, confirmed, f"✅ {trade['action']} order confirmed after timeout: {client_order_id}")
 
-def run_hft_scalping_cycle():
-    """Run one HFT scalping cycle"""
-    print(f"🚀 STARTING HFT SCALPING CYCLE")
-    print(f"🎯 Strategy: {HFT_PARAMS['position_size_pct']}% positions, {HFT_PARAMS['profit_target_pct']}% targets")
+def execute_hft_trades(trades):
+    """Submit a batch of HFT trades concurrently and track the results.
     
-    reset_daily_trades()
+    Each trade is a dict with ticker, action (BUY/SELL), shares, price and
+    reason. Returns one execution dict per trade, in order.
+    """
+    if not trades:
+        return []
     
-    # Get dynamic watchlist
-    watchlist = get_dynamic_watchlist()
-    if not watchlist:
-        print("❌ No stocks found for trading")
-        return {"error": "No stocks available"}
+    submissions = submit_orders([
+        {'ticker': t['ticker'], 'qty': t['shares'], 'side': t['action'].lower()} for t in trades
+    ])
     
-    results = {
-        "timestamp": datetime.now().isoformat(),
-        "trades_executed": 0,
-        "buy_trades": 0,
-        "sell_trades": 0,
-        "total_pnl": 0,
-        "cycle_results": []
-    }
+    executions = []
+    for trade, submission in zip(trades, submissions):
+        ticker = trade['ticker']
+        client_order_id = submission['client_order_id']
+        if not submission['submitted']:
+            with _book_lock:
+                if submission.get('pending'):
+                    # It may still reach the broker: settle it from its fill or
+                    # a lookup, and keep a SELL's position claimed until then
+                    unconfirmed_orders[client_order_id] = dict(trade, submitted_at=time.time())
+                elif trade['action'] == "SELL":
+                    # Let the next check retry the exit
+                    active_positions.get(ticker, {}).pop('exiting', None)
+            executions.append({"executed": False, "pending": bool(submission.get('pending')), "error": submission['error']})
+            continue
+        
+        with _book_lock:
+            # Fills may already have arrived (simulated broker) or land later
+            # through the trade update stream; _on_fill handles the latter
+            fill = fill_tracker.get_fill(client_order_id)
+            _book_submission(trade, client_order_id, fill)
+        
+        executions.append({
+            "executed": True,
+            "result": submission['result'],
+            "latency_ms": submission['latency_ms'],
+            "price": fill['filled_avg_price'] if fill else trade['price']
+        })
+    
+    # Log only once every submission is booked
+    for trade, execution in zip(trades, executions):
+        if execution["executed"]:
+            _log_trade(trade, execution['price'], execution['result'])
+    
+    return executions
+
+def execute_hft_trade(ticker, action, shares, price, reason=""):
+    """Execute HFT trade with aggressive sizing"""
+    return execute_hft_trades([{
+        'ticker': ticker, 'action': action, 'shares': shares, 'price': price, 'reason': reason
+    }])[0]
+
+def _run_exit_stage(results):
+    """Evaluate and submit exits for held tickers (the latency-sensitive path)"""
+    if unconfirmed_orders:
+        _resolve_unconfirmed_orders()
+    with _book_lock:
+        held = list(active_positions)
+    print(f"\n🔍 PHASE 1: Managing {len(held)} active positions...")
+    if not held:
+        return
     
-    # PHASE 1: Manage existing positions (SELL)
-    print(f"\n🔍 PHASE 1: Managing {len(active_positions)} active positions...")
-    exits = manage_active_positions()
+    snapshot = build_market_snapshot(held)
+    results["snapshot_size"] += len(snapshot)
+    # The position monitor may already be exiting some of these
+    exits = [exit_trade for exit_trade in manage_active_positions(snapshot) if claim_exit(exit_trade['ticker'])]
     
     for exit_trade in exits:
         print(f"💰 EXIT SIGNAL: {exit_trade['ticker']} - {exit_trade['reason']}")
-        
-        execution = execute_hft_trade(
-            exit_trade['ticker'], 
-            "SELL", 
-            exit_trade['shares'],
-            exit_trade['current_price'],
-            f"HFT Exit: {exit_trade['reason']}"
-        )
-        
+    
+    executions = execute_hft_trades([{
+        'ticker': exit_trade['ticker'],
+        'action': "SELL",
+        'shares': exit_trade['shares'],
+        'price': exit_trade['current_price'],
+        'reason': f"HFT Exit: {exit_trade['reason']}"
+    } for exit_trade in exits])
+    
+    for exit_trade, execution in zip(exits, executions):
         if execution["executed"]:
             results["trades_executed"] += 1
             results["sell_trades"] += 1
             results["total_pnl"] += exit_trade['profit_pct']
             print(f"✅ SELL EXECUTED: {exit_trade['ticker']} ({exit_trade['profit_pct']:.2f}%)")
-    
-    # PHASE 2: Find new entries (BUY)
+
+def _run_entry_stage(watchlist, results, executor):
+    """Scan the watchlist in chunks and hand each chunk's entries to the
+    order executor as soon as they qualify, while the next chunk is fetched"""
     available_slots = HFT_PARAMS["max_positions"] - len(active_positions)
-    if available_slots > 0:
-        print(f"\n🔍 PHASE 2: Scanning for {available_slots} new entries...")
-        
-        position_size = calculate_position_size()
+    if available_slots <= 0:
+        return
+    print(f"\n🔍 PHASE 2: Scanning for {available_slots} new entries...")
+    
+    position_size = calculate_position_size()
+    candidates = [ticker for ticker in dict.fromkeys(watchlist) if ticker not in active_positions]
+    chunk_size = ORDER_PARAMS["entry_chunk_size"]
+    
+    submitted = []  # (entries, future) per chunk
+    queued = 0
+    for start in range(0, len(candidates), chunk_size):
+        if queued >= available_slots:
+            break
+        chunk = candidates[start:start + chunk_size]
+        snapshot = build_market_snapshot(chunk)
+        results["snapshot_size"] += len(snapshot)
         
-        for ticker in watchlist:
-            if available_slots <= 0:
+        entries = []
+        for ticker in chunk:
+            if queued + len(entries) >= available_slots:
                 break
+            
+            if should_buy_stock(ticker, snapshot):
+                price_data = snapshot[ticker]
                 
-            if ticker in active_positions:
-                continue  # Already holding
-                
-            if should_buy_stock(ticker):
-                price_data = get_price_movement(ticker)
-                if not price_data:
-                    continue
-                    
                 # Calculate shares for 10% position
                 shares = max(1, int(position_size / price_data['price']))
                 
                 print(f"🎯 BUY SIGNAL: {ticker} @ ${price_data['price']:.2f} ({price_data['change_pct']:.2f}%)")
                 
-                execution = execute_hft_trade(
-                    ticker, "BUY", shares, price_data['price'],
-                    f"HFT Entry: {price_data['change_pct']:.2f}% move"
-                )
-                
-                if execution["executed"]:
-                    results["trades_executed"] += 1
-                    results["buy_trades"] += 1
-                    available_slots -= 1
-                    print(f"✅ BUY EXECUTED: {ticker} - {shares} shares (${shares * price_data['price']:.2f})")
-                
-                time.sleep(0.5)  # Small delay between entries
+                entries.append({
+                    'ticker': ticker,
+                    'action': "BUY",
+                    'shares': shares,
+                    'price': price_data['price'],
+                    'reason': f"HFT Entry: {price_data['change_pct']:.2f}% move"
+                })
+        
+        if entries:
+            queued += len(entries)
+            submitted.append((entries, executor.submit(execute_hft_trades, entries)))
+    
+    for entries, future in submitted:
+        try:
+            executions = future.result()
+        except Exception as e:
+            # Keep collecting the other batches rather than failing the cycle
+            print(f"❌ Entry batch error for {[entry['ticker'] for entry in entries]}: {e}")
+            continue
+        for entry, execution in zip(entries, executions):
+            if execution["executed"]:
+                results["trades_executed"] += 1
+                results["buy_trades"] += 1
+                print(f"✅ BUY EXECUTED: {entry['ticker']} - {entry['shares']} shares (${entry['shares'] * entry['price']:.2f}) in {execution['latency_ms']:.0f}ms")
+
+def run_hft_scalping_cycle(watchlist=None):
+    """Run one HFT scalping cycle (on a fixed watchlist if one is given).
+    
+    Pipelined: exits on held tickers run straight away while the dynamic
+    watchlist is built in the background, and entries are submitted chunk
+    by chunk as they qualify. When the watchlist refresher has a recent
+    enough list, it is used as-is and no discovery runs in the cycle.
+    """
+    print(f"🚀 STARTING HFT SCALPING CYCLE")
+    print(f"🎯 Strategy: {HFT_PARAMS['position_size_pct']}% positions, {HFT_PARAMS['profit_target_pct']}% targets")
+    
+    reset_daily_trades()
+    
+    results = {
+        "timestamp": datetime.now().isoformat(),
+        "trades_executed": 0,
+        "buy_trades": 0,
+        "sell_trades": 0,
+        "total_pnl": 0,
+        "snapshot_size": 0,
+        "cycle_results": []
+    }
+    
+    if not watchlist and watchlist_refresher.is_running():
+        latest, age = watchlist_refresher.latest()
+        if latest and age <= WATCHLIST_PARAMS["max_staleness_seconds"]:
+            watchlist = latest
+            results["watchlist_age_seconds"] = age
+            print(f"📋 Using background watchlist ({len(latest)} stocks, {age:.0f}s old)")
+        else:
+            print("⚠️ Background watchlist missing or stale, scanning in this cycle")
+    
+    # One worker builds the watchlist, the other submits entry batches
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        watchlist_future = None if watchlist else executor.submit(get_dynamic_watchlist)
+        
+        # PHASE 1: Manage existing positions (SELL) - never waits on discovery
+        _run_exit_stage(results)
+        
+        # PHASE 2: Find new entries (BUY)
+        if watchlist_future:
+            try:
+                watchlist = watchlist_future.result()
+            except Exception as e:
+                print(f"❌ Watchlist error: {e}")
+                watchlist = []
+        if not watchlist:
+            print("❌ No stocks found for trading")
+            if not results["trades_executed"]:
+                return {"error": "No stocks available"}
+        else:
+            _run_entry_stage(watchlist, results, executor)
     
     # Results summary
     portfolio = tools.get_portfolio_summary()
@@ -274,7 +527,7 @@ def run_hft_scalping_cycle():
 
 def get_hft_stats():
     """Get HFT trading statistics"""
-    if not tools.trading_client:
+    if not tools.get_client():
         return {"error": "Trading client not available"}
     
     try:
@@ -290,7 +543,10 @@ def get_hft_stats():
             "max_positions": HFT_PARAMS["max_positions"],
             "daily_trades": daily_trades["trades_count"],
             "last_trade_time": daily_trades["last_trade_time"],
+            "realized_pnl": daily_trades["realized_pnl"],
             "position_size_pct": HFT_PARAMS["position_size_pct"],
+            "order_latency": get_order_latency_stats(),
+            "fill_latency": fill_tracker.latency_stats(),
             "strategy": "HFT_SCALPING"
         }
     except Exception as e:
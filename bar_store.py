@@ -0,0 +1,205 @@
+# bar_store.py
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+# One fixed-size record per bar; files are plain arrays of these records, so
+# they can be appended to in place and memory-mapped for reads.
+BAR_DTYPE = np.dtype([
+    ("timestamp", "<i8"),   # UTC nanoseconds
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+])
+
+DAY_NS = 86_400 * 10**9
+# Incremental fetches are grouped by the hour of each ticker's last bar
+SINCE_BUCKET_NS = 3_600 * 10**9
+
+_PERIOD_DAYS = {"wk": 7, "mo": 31, "y": 366}
+
+def _period_start(timestamps, period):
+    """Index of the first bar inside a yfinance-style period ("1d", "5d", "1mo", "max")"""
+    if period in (None, "max") or len(timestamps) == 0:
+        return 0
+
+    if period.endswith("d"):
+        # Last N distinct trading dates, like yfinance's intraday periods.
+        # Only the tail is scanned: no interval has 2000 bars in a day.
+        days = timestamps // DAY_NS
+        distinct = np.unique(days[-int(period[:-1]) * 2000:])
+        first_day = distinct[-min(int(period[:-1]), len(distinct))]
+        return int(np.searchsorted(days, first_day))
+
+    for suffix, days in _PERIOD_DAYS.items():
+        if period.endswith(suffix):
+            span = int(period[:-len(suffix)]) * days * DAY_NS
+            return int(np.searchsorted(timestamps, timestamps[-1] - span, side="right"))
+    return 0
+
+def _period_span_ns(period):
+    """Calendar length of a yfinance-style period in ns (None for max)"""
+    if period in (None, "max"):
+        return None
+    if period.endswith("d"):
+        return int(period[:-1]) * DAY_NS
+    for suffix, days in _PERIOD_DAYS.items():
+        if period.endswith(suffix):
+            return int(period[:-len(suffix)]) * days * DAY_NS
+    return None
+
+def _to_records(frame):
+    """Convert an OHLCV DataFrame to sorted, de-duplicated bar records"""
+    frame = frame.dropna(subset=["Close"])
+    index = pd.DatetimeIndex(frame.index)
+    index = index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+
+    records = np.empty(len(frame), dtype=BAR_DTYPE)
+    records["timestamp"] = index.as_unit("ns").asi8
+    records["open"] = frame["Open"].to_numpy(dtype=float)
+    records["high"] = frame["High"].to_numpy(dtype=float)
+    records["low"] = frame["Low"].to_numpy(dtype=float)
+    records["close"] = frame["Close"].to_numpy(dtype=float)
+    records["volume"] = frame["Volume"].to_numpy(dtype=float)
+
+    records = records[np.argsort(records["timestamp"], kind="stable")]
+    # Keep the last version of any repeated timestamp
+    keep = np.append(records["timestamp"][1:] != records["timestamp"][:-1], True)
+    return records[keep]
+
+def records_to_frame(records):
+    """Build an OHLCV DataFrame from bar records"""
+    index = pd.to_datetime(records["timestamp"], utc=True)
+    return pd.DataFrame({
+        "Open": records["open"],
+        "High": records["high"],
+        "Low": records["low"],
+        "Close": records["close"],
+        "Volume": records["volume"],
+    }, index=index)
+
+class BarStore:
+    """Persistent per-ticker/interval bar files with incremental append.
+
+    Only bars after the last stored timestamp are fetched and appended; the
+    still-forming last bar is rewritten in place. Reads are memory-mapped
+    slices of the file.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+        self.bars_fetched = 0
+        self.bars_appended = 0
+        self._stats_lock = threading.Lock()  # Counters are shared by every ticker
+
+    def _lock(self, ticker, interval):
+        with self._locks_lock:
+            return self._locks.setdefault((ticker, interval), threading.Lock())
+
+    def _path(self, ticker, interval):
+        return os.path.join(self.root, interval, f"{ticker}.bin")
+
+    def _read(self, path):
+        if not os.path.exists(path) or os.path.getsize(path) < BAR_DTYPE.itemsize:
+            return np.empty(0, dtype=BAR_DTYPE)
+        return np.memmap(path, dtype=BAR_DTYPE, mode="r")
+
+    def read(self, ticker, interval, period=None):
+        """Memory-mapped records for a ticker, limited to the trailing period"""
+        with self._lock(ticker, interval):
+            records = self._read(self._path(ticker, interval))
+        return records[_period_start(records["timestamp"], period):]
+
+    def read_frame(self, ticker, interval, period=None):
+        return records_to_frame(self.read(ticker, interval, period))
+
+    def last_timestamp(self, ticker, interval):
+        """Last stored bar time (UTC ns), or None if nothing is stored"""
+        records = self.read(ticker, interval)
+        return int(records["timestamp"][-1]) if len(records) else None
+
+    def append(self, ticker, interval, frame):
+        """Append bars newer than the last stored one; returns bars written"""
+        if frame is None or frame.empty:
+            return 0
+        records = _to_records(frame)
+        path = self._path(ticker, interval)
+
+        with self._lock(ticker, interval):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            stored = self._read(path)
+            written = 0
+
+            if len(stored):
+                last = int(stored["timestamp"][-1])
+                del stored
+                records = records[records["timestamp"] >= last]
+                if len(records) and records["timestamp"][0] == last:
+                    # Refresh the forming bar in place
+                    with open(path, "r+b") as f:
+                        f.seek(-BAR_DTYPE.itemsize, os.SEEK_END)
+                        f.write(records[:1].tobytes())
+                    records = records[1:]
+                    written += 1
+
+            if len(records):
+                with open(path, "ab") as f:
+                    f.write(records.tobytes())
+                written += len(records)
+
+            with self._stats_lock:
+                self.bars_appended += written
+        return written
+
+    def refresh(self, provider, tickers, period, interval):
+        """Bring stored series up to date and return period-sliced frames.
+
+        Tickers seen for the first time, or whose last stored bar is older
+        than the period, get a full period download. The rest are grouped by
+        the hour of their last stored bar and each group is fetched from
+        there onwards, so one lagging ticker doesn't widen every request.
+        Only tickers the provider returned bars for are in the result; a
+        failed fetch never passes stored bars off as current.
+        """
+        tickers = list(tickers)
+        last_seen = {ticker: self.last_timestamp(ticker, interval) for ticker in tickers}
+
+        span = _period_span_ns(period)
+        now = provider.now().value
+        new, since = [], {}
+        for ticker, ts in last_seen.items():
+            if ts is None or (span is not None and now - ts > span):
+                new.append(ticker)
+            else:
+                since.setdefault(ts - ts % SINCE_BUCKET_NS, []).append(ticker)
+
+        fetched = {}
+        if new:
+            fetched.update(provider.get_bars_batch(new, period=period, interval=interval))
+        for bucket, group in since.items():
+            start = pd.Timestamp(bucket, unit="ns", tz="UTC")
+            fetched.update(provider.get_bars_batch_since(group, start, interval=interval))
+
+        for ticker, hist in fetched.items():
+            with self._stats_lock:
+                self.bars_fetched += len(hist)
+            self.append(ticker, interval, hist)
+
+        frames = {}
+        for ticker in tickers:
+            if ticker not in fetched:
+                continue
+            records = self.read(ticker, interval, period)
+            if len(records):
+                frames[ticker] = records_to_frame(records)
+        return frames
+
+    def stats(self):
+        with self._stats_lock:
+            return {"bars_fetched": self.bars_fetched, "bars_appended": self.bars_appended}
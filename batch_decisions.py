@@ -0,0 +1,209 @@
+# batch_decisions.py
+"""Batched LLM trading decisions.
+
+Instead of one agent conversation per ticker, compact pre-computed features
+for many tickers go into a single prompt and the model returns a validated,
+structured list of decisions. Large watchlists are split into chunks that
+are sent in parallel.
+"""
+import threading
+from datetime import datetime
+from typing import List, Literal
+
+from pydantic import BaseModel, Field
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+import tools
+from market_data import fetch_bars_batch
+from indicators import IndicatorBook
+from broker_state import position_book
+from fetch_engine import fetch_concurrently
+from analytics_logger import log_decision_analytics
+from llm_metrics import llm_metrics, new_cycle_id, per_decision_share, with_counted_retries
+from trading_config import DEFAULT_WATCHLIST, TRADING_PARAMS, BATCH_DECISION_PARAMS
+
+class TickerDecision(BaseModel):
+    ticker: str = Field(description="Ticker symbol exactly as given")
+    action: Literal["BUY", "SELL", "HOLD"]
+    confidence: Literal["LOW", "MEDIUM", "HIGH"]
+    reason: str = Field(description="One short sentence")
+
+class DecisionBatch(BaseModel):
+    decisions: List[TickerDecision]
+
+CONFIDENCE_LEVELS = ["LOW", "MEDIUM", "HIGH"]
+
+BATCH_PROMPT = """You are a disciplined swing trading assistant. For EACH ticker below decide BUY, SELL or HOLD
+with a confidence (LOW/MEDIUM/HIGH) and a one-sentence reason.
+
+Rules:
+- SELL only tickers we hold (held > 0)
+- BUY on oversold RSI (< 30) or price above both moving averages with rising volume
+- Otherwise HOLD
+
+Return exactly one decision per ticker.
+
+Columns: ticker | price | day change % | RSI | price vs SMA20 % | price vs SMA50 % | volume ratio | held shares
+{rows}
+"""
+
+# Daily-bar indicator state, reused across batches
+daily_indicators = IndicatorBook()
+
+_llm = None
+_llm_lock = threading.Lock()
+
+def _get_structured_llm():
+    global _llm
+    with _llm_lock:
+        if _llm is None:
+            llm = ChatGoogleGenerativeAI(
+                model="gemini-2.5-flash",
+                temperature=0,
+                timeout=BATCH_DECISION_PARAMS["llm_timeout_seconds"],
+                max_retries=0,  # Retried below, where the metrics can count it
+            )
+            _llm = with_counted_retries(llm.with_structured_output(DecisionBatch),
+                                        BATCH_DECISION_PARAMS["llm_max_retries"])
+        return _llm
+
+def _pct_vs(price, reference):
+    return (price / reference - 1) * 100 if price and reference else None
+
+def compute_features(tickers):
+    """Compact per-ticker features from daily bars and the position book"""
+    bars = fetch_bars_batch(tickers, period="3mo", interval="1d")
+    try:
+        position_book.ensure_fresh(tools.get_client())
+    except Exception as e:
+        print(f"❌ Position sync failed: {e}")
+
+    features = {}
+    for ticker in tickers:
+        hist = bars.get(ticker)
+        if hist is None or hist.empty:
+            continue
+        values = daily_indicators.update(ticker, hist)
+        position = position_book.get(ticker)
+        features[ticker] = {
+            'price': values['price'],
+            'change_pct': values['change_pct'],
+            'rsi': values['rsi'],
+            'vs_sma_short_pct': _pct_vs(values['price'], values['sma_short']),
+            'vs_sma_long_pct': _pct_vs(values['price'], values['sma_long']),
+            'volume_ratio': values['volume_ratio'],
+            'held': position['qty'] if position else 0,
+        }
+    return features
+
+def _fmt(value, spec=".2f"):
+    return "n/a" if value is None else format(value, spec)
+
+def _feature_row(ticker, f):
+    return " | ".join([
+        ticker, _fmt(f['price']), _fmt(f['change_pct']), _fmt(f['rsi'], ".1f"),
+        _fmt(f['vs_sma_short_pct']), _fmt(f['vs_sma_long_pct']), _fmt(f['volume_ratio']), f"{f['held']:g}",
+    ])
+
+def chunk_rows(rows, max_tickers=None, max_chars=None):
+    """Split (ticker, row) pairs into prompt-sized chunks"""
+    max_tickers = max_tickers or BATCH_DECISION_PARAMS["max_tickers_per_call"]
+    max_chars = max_chars or BATCH_DECISION_PARAMS["max_prompt_chars"]
+    budget = max_chars - len(BATCH_PROMPT)
+
+    chunks, current, size = [], [], 0
+    for ticker, row in rows:
+        if current and (len(current) >= max_tickers or size + len(row) + 1 > budget):
+            chunks.append(current)
+            current, size = [], 0
+        current.append((ticker, row))
+        size += len(row) + 1
+    if current:
+        chunks.append(current)
+    return chunks
+
+def _decide_chunk(chunk, cycle_id):
+    prompt = BATCH_PROMPT.format(rows="\n".join(row for _, row in chunk))
+    # Latencies of a shared call are recorded under "batch"; tokens are split per ticker
+    handler = llm_metrics.handler(ticker="batch", cycle_id=cycle_id)
+    try:
+        batch = _get_structured_llm().invoke(prompt, config={"callbacks": [handler]})
+    finally:
+        totals = llm_metrics.finish(handler, tickers=[ticker for ticker, _ in chunk])
+
+    # Keep one decision per requested ticker; ignore anything else
+    wanted = {ticker for ticker, _ in chunk}
+    decisions = {}
+    for decision in batch.decisions if batch else []:
+        ticker = decision.ticker.strip().upper()
+        if ticker in wanted and ticker not in decisions:
+            decisions[ticker] = decision.model_copy(update={"ticker": ticker})
+
+    missing = wanted - set(decisions)
+    if missing:
+        print(f"⚠️ No decision returned for: {sorted(missing)}")
+    return list(decisions.values()), dict(totals, batch_size=len(chunk))
+
+def decide_batch(tickers=None, log=True):
+    """Decide on a whole watchlist in as few LLM calls as possible.
+
+    Returns a list of decision dicts (ticker, action, confidence, reason,
+    features, llm metrics), each also written to the decision log. 'llm' is
+    this decision's share of its call, so it sums and averages like the
+    agent's per-decision totals; 'llm_call' is the whole call's totals.
+    """
+    tickers = list(dict.fromkeys(t.upper() for t in (tickers or DEFAULT_WATCHLIST)))
+    features = compute_features(tickers)
+    if not features:
+        return []
+
+    chunks = chunk_rows([(ticker, _feature_row(ticker, f)) for ticker, f in features.items()])
+    print(f"🧮 Batch decisions for {len(features)} tickers in {len(chunks)} LLM call(s)")
+
+    cycle_id = new_cycle_id()
+    # Wait out every retry attempt and its backoff (at most ~11s each), so a
+    # result we'd still pay for is never discarded as a timeout
+    retries = BATCH_DECISION_PARAMS["llm_max_retries"]
+    decided, errors = fetch_concurrently(
+        lambda i: _decide_chunk(chunks[i], cycle_id),
+        list(range(len(chunks))),
+        max_workers=len(chunks),
+        timeout=BATCH_DECISION_PARAMS["llm_timeout_seconds"] * (retries + 1) + 11 * retries + 5
+    )
+    for i, e in errors.items():
+        print(f"❌ Batch decision call failed for {[t for t, _ in chunks[i]]}: {e}")
+
+    results = []
+    timestamp = datetime.now().isoformat()
+    for i in sorted(decided):
+        chunk_decisions, llm_totals = decided[i]
+        llm_share = per_decision_share(llm_totals)
+        for decision in chunk_decisions:
+            record = {
+                'timestamp': timestamp,
+                **decision.model_dump(),
+                'features': features[decision.ticker],
+                'mode': 'batch',
+                'llm': llm_share,
+                'llm_call': llm_totals,
+            }
+            if log:
+                log_decision_analytics(record)
+            results.append(record)
+    return results
+
+def execute_decisions(decisions, shares=1):
+    """Place 1-share orders for decisions at or above TRADING_PARAMS['min_confidence']"""
+    min_level = CONFIDENCE_LEVELS.index(TRADING_PARAMS["min_confidence"])
+    executed = []
+    for decision in decisions:
+        if decision['action'] == "HOLD" or CONFIDENCE_LEVELS.index(decision['confidence']) < min_level:
+            continue
+        if decision['action'] == "SELL" and not decision['features']['held']:
+            continue
+        try:
+            order = tools.submit_market_order(decision['ticker'], shares, decision['action'].lower())
+            executed.append({**decision, 'order_id': str(order.id)})
+        except Exception as e:
+            print(f"❌ Order failed for {decision['ticker']}: {e}")
+    return executed
@@ -0,0 +1,81 @@
+# benchmark_hft.py
+"""Offline HFT cycle benchmark.
+
+Replays recorded bars (see market_data.record_bars) through the simulated
+paper broker, so the full cycle - snapshot, signals, sizing, order routing -
+runs with no network access. Usage:
+
+    python benchmark_hft.py --replay-dir market_replay --cycles 1000
+"""
+import os
+import io
+import sys
+import glob
+import time
+import argparse
+import tempfile
+import contextlib
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HFT cycles offline")
+    parser.add_argument("--replay-dir", required=True, help="Directory of recorded bars")
+    parser.add_argument("--interval", default="2m", help="Recorded bar interval")
+    parser.add_argument("--tickers", default=None, help="Comma-separated watchlist (default: all recorded)")
+    parser.add_argument("--cycles", type=int, default=1000)
+    parser.add_argument("--step-seconds", type=int, default=120, help="Replay clock advance per cycle")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated order ack latency")
+    parser.add_argument("--slippage-bps", type=float, default=2.0)
+    args = parser.parse_args()
+
+    replay_dir = os.path.abspath(args.replay_dir)
+    tickers = args.tickers.split(",") if args.tickers else sorted(
+        os.path.basename(path)[:-len(f"_{args.interval}.csv")]
+        for path in glob.glob(os.path.join(replay_dir, f"*_{args.interval}.csv"))
+    )
+    if not tickers:
+        sys.exit(f"No {args.interval} recordings found in {replay_dir}")
+
+    os.environ["MARKET_DATA_PROVIDER"] = "replay"
+    os.environ["MARKET_DATA_REPLAY_DIR"] = replay_dir
+    os.environ["BROKER_BACKEND"] = "simulated"
+
+    # Trade logs and the bar store are written relative to the working
+    # directory; keep them out of the real trading_logs/
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.chdir(tempfile.mkdtemp(prefix="hft_bench_"))
+
+    import tools
+    import automated_agent
+    from market_data import get_provider, bar_cache
+    from paper_broker import create_simulated_broker
+    from fill_tracker import fill_tracker
+    from order_router import get_order_latency_stats
+
+    broker = create_simulated_broker(latency_ms=args.latency_ms, slippage_bps=args.slippage_bps,
+                                     price_interval=args.interval)
+    tools.trading_client = broker
+
+    provider = get_provider()
+    first_bars = provider.get_bars(tickers[0], period="max", interval=args.interval)
+    provider.set_clock(first_bars.index[min(30, len(first_bars) - 1)])
+
+    trades = 0
+    start = time.perf_counter()
+    for _ in range(args.cycles):
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = automated_agent.run_hft_scalping_cycle(watchlist=tickers)
+        trades += result.get("trades_executed", 0)
+        provider.advance(args.step_seconds)
+    elapsed = time.perf_counter() - start
+
+    account = broker.get_account()
+    print(f"⚡ {args.cycles} cycles on {len(tickers)} tickers in {elapsed:.1f}s "
+          f"({args.cycles / elapsed * 60:,.0f} cycles/min, {elapsed / args.cycles * 1000:.1f} ms/cycle)")
+    print(f"📊 Trades: {trades}")
+    print(f"⏱️ Order latency: {get_order_latency_stats()}")
+    print(f"⏱️ Fill latency: {fill_tracker.latency_stats()}")
+    print(f"🗄️ Bar cache: {bar_cache.stats()}")
+    print(f"💵 Final portfolio: ${account.portfolio_value:,.2f}")
+
+if __name__ == "__main__":
+    main()
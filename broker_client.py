@@ -0,0 +1,62 @@
+# broker_client.py
+import os
+import threading
+
+from requests.adapters import HTTPAdapter
+
+from fill_tracker import fill_tracker
+from trading_config import BROKER_PARAMS
+
+_clients = {}
+_lock = threading.Lock()
+
+def _pool_session(client):
+    """Size the client's keep-alive connection pool for concurrent order submission"""
+    session = getattr(client, "_session", None)
+    if session is None:
+        return
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=BROKER_PARAMS["http_pool_size"])
+    session.mount("https://", adapter)
+
+def _create_client(backend, api_key, secret_key, paper):
+    if backend == "simulated":
+        from paper_broker import create_simulated_broker
+        return create_simulated_broker()
+
+    from alpaca.trading.client import TradingClient
+    client = TradingClient(api_key, secret_key, paper=paper)
+    _pool_session(client)
+    fill_tracker.start_alpaca_stream(api_key, secret_key, paper=paper)
+    return client
+
+def get_trading_client(api_key=None, secret_key=None, paper=True, backend=None):
+    """Process-wide broker client for a credential set, created on first use.
+
+    Every module and Streamlit session shares the same client (and its
+    pooled HTTP session). Returns None when Alpaca keys are missing.
+    """
+    backend = backend or os.environ.get('BROKER_BACKEND', BROKER_PARAMS["backend"])
+    if backend == "simulated":
+        key = ("simulated",)
+    else:
+        api_key = api_key or os.environ.get('APCA_API_KEY_ID')
+        secret_key = secret_key or os.environ.get('APCA_API_SECRET_KEY')
+        if not (api_key and secret_key):
+            return None
+        key = ("alpaca", api_key, secret_key, paper)
+
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        # Re-check: another thread may have created it while we waited
+        if key not in _clients:
+            _clients[key] = _create_client(backend, api_key, secret_key, paper)
+            print(f"✅ {'Simulated paper broker' if backend == 'simulated' else 'Alpaca client'} initialized")
+        return _clients[key]
+
+def clear_clients():
+    """Drop all cached clients (e.g. after rotating keys)"""
+    with _lock:
+        _clients.clear()
@@ -0,0 +1,133 @@
+# broker_state.py
+import time
+import threading
+
+from trading_config import BROKER_PARAMS
+
+class PositionBook:
+    """In-memory positions indexed by symbol, kept in sync with the broker.
+
+    Loaded once from get_all_positions(), updated locally when our own orders
+    fill, and reconciled against the broker every reconcile_seconds or on
+    demand. Fills that happened before the last reconcile started are
+    already in it and are not applied again.
+    """
+
+    def __init__(self, reconcile_seconds):
+        self.reconcile_seconds = reconcile_seconds
+        self.last_sync = None
+        self.synced_at = None  # Wall-clock time the last sync's request was sent
+        self._positions = {}
+        self._lock = threading.Lock()
+
+    def sync(self, client):
+        """Replace the book with the broker's current positions"""
+        requested_at = time.time()
+        positions = client.get_all_positions()
+        with self._lock:
+            self._positions = {
+                p.symbol: {
+                    "symbol": p.symbol,
+                    "qty": float(p.qty),
+                    "market_value": float(p.market_value),
+                    "current_price": float(p.current_price),
+                    "avg_entry_price": float(p.avg_entry_price),
+                } for p in positions
+            }
+            self.last_sync = time.monotonic()
+            self.synced_at = requested_at
+
+    def is_stale(self):
+        return self.last_sync is None or time.monotonic() - self.last_sync > self.reconcile_seconds
+
+    def ensure_fresh(self, client):
+        """Reconcile with the broker if the book was never loaded or is too old"""
+        if self.is_stale():
+            self.sync(client)
+
+    def mark_stale(self):
+        """Force a reconcile on the next read"""
+        with self._lock:
+            self.last_sync = None
+
+    def get(self, symbol):
+        with self._lock:
+            position = self._positions.get(symbol)
+            return dict(position) if position else None
+
+    def all(self):
+        with self._lock:
+            return [dict(p) for p in self._positions.values()]
+
+    def apply_fill(self, symbol, side, qty, price, filled_at=None):
+        """Apply one of our own fills without a broker round trip.
+
+        filled_at (epoch seconds) is when the broker filled it; a fill from
+        before the last sync is already in the book and is skipped. Returns
+        whether the fill was applied.
+        """
+        qty, price = float(qty), float(price)
+        with self._lock:
+            if filled_at is not None and self.synced_at is not None and filled_at <= self.synced_at:
+                return False
+            position = self._positions.get(symbol)
+            held = position["qty"] if position else 0.0
+
+            if side.lower() == "buy":
+                new_qty = held + qty
+                cost = (position["avg_entry_price"] * held if position else 0.0) + price * qty
+                avg_entry = cost / new_qty
+            else:
+                new_qty = held - qty
+                avg_entry = position["avg_entry_price"] if position else price
+
+            if new_qty <= 0:
+                self._positions.pop(symbol, None)
+                return True
+
+            self._positions[symbol] = {
+                "symbol": symbol,
+                "qty": new_qty,
+                "market_value": new_qty * price,
+                "current_price": price,
+                "avg_entry_price": avg_entry,
+            }
+            return True
+
+class AccountSnapshot:
+    """Short-lived cache of the broker account balances.
+
+    Sizing, cycle summaries and the UI all read from here; it is invalidated
+    explicitly whenever we submit an order or see a fill.
+    """
+
+    def __init__(self, ttl_seconds):
+        self.ttl_seconds = ttl_seconds
+        self.fetches = 0
+        self._account = None
+        self._fetched_at = None
+        self._lock = threading.Lock()
+
+    def get(self, client):
+        """Account balances, fetched from the broker only when expired"""
+        with self._lock:
+            # Holding the lock while fetching stops concurrent readers from
+            # all hitting the broker at once
+            if self._fetched_at is None or time.monotonic() - self._fetched_at > self.ttl_seconds:
+                account = client.get_account()
+                self._account = {
+                    "cash": float(account.cash),
+                    "portfolio_value": float(account.portfolio_value),
+                    "equity": float(account.equity),
+                    "buying_power": float(account.buying_power),
+                }
+                self._fetched_at = time.monotonic()
+                self.fetches += 1
+            return dict(self._account)
+
+    def invalidate(self):
+        with self._lock:
+            self._fetched_at = None
+
+position_book = PositionBook(BROKER_PARAMS["position_reconcile_seconds"])
+account_snapshot = AccountSnapshot(BROKER_PARAMS["account_ttl_seconds"])
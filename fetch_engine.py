@@ -0,0 +1,109 @@
+# fetch_engine.py
+import math
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from trading_config import FETCH_PARAMS
+
+class RateLimiter:
+    """Thread-safe token bucket limiting calls per second to one provider"""
+
+    def __init__(self, rate_per_sec, burst=None):
+        self.rate = float(rate_per_sec)
+        self.capacity = float(burst or max(1, rate_per_sec))
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a call is allowed"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_time = (1 - self._tokens) / self.rate
+            time.sleep(wait_time)
+
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+def get_rate_limiter(provider):
+    """Get the shared rate limiter for a provider, or None if unlimited"""
+    rate = FETCH_PARAMS["rate_limits"].get(provider)
+    if not rate:
+        return None
+    with _rate_limiters_lock:
+        if provider not in _rate_limiters:
+            _rate_limiters[provider] = RateLimiter(rate)
+        return _rate_limiters[provider]
+
+def rate_limited(provider):
+    """Wait for the provider's shared rate limit, if it has one"""
+    limiter = get_rate_limiter(provider) if provider else None
+    if limiter:
+        limiter.acquire()
+
+def fetch_concurrently(func, items, max_workers=None, provider=None, timeout=None, overall_timeout=None):
+    """Run func(item) for every item on a bounded thread pool.
+
+    At most max_workers calls are in flight, calls to the same provider share
+    a rate limit, and any call running longer than timeout seconds is given up
+    on. The whole batch is bounded too: whatever hasn't finished after
+    overall_timeout seconds (default: timeout per wave of max_workers items)
+    is given up on, so hung calls can't keep queued items waiting forever.
+    Results are partial: returns (results, errors), two dicts keyed by item,
+    so one slow or failing item never blocks the others.
+    """
+    items = list(dict.fromkeys(items))
+    max_workers = max_workers or FETCH_PARAMS["max_workers"]
+    timeout = timeout or FETCH_PARAMS["task_timeout_seconds"]
+    results, errors = {}, {}
+    if not items:
+        return results, errors
+
+    workers = min(max_workers, len(items))
+    overall_timeout = overall_timeout or timeout * math.ceil(len(items) / workers)
+    deadline = time.monotonic() + overall_timeout
+    started = {}
+
+    def run(item):
+        rate_limited(provider)
+        started[item] = time.monotonic()
+        return func(item)
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {executor.submit(run, item): item for item in items}
+        pending = set(futures)
+
+        while pending:
+            done, pending = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = futures[future]
+                try:
+                    results[item] = future.result()
+                except Exception as e:
+                    errors[item] = e
+
+            now = time.monotonic()
+            for future in list(pending):
+                item = futures[future]
+                if item in started and now - started[item] > timeout:
+                    error = TimeoutError(f"{item} timed out after {timeout}s")
+                elif now > deadline:
+                    error = TimeoutError(f"{item} not done within the batch's {overall_timeout:.0f}s")
+                else:
+                    continue
+                future.cancel()
+                pending.discard(future)
+                errors[item] = error
+    finally:
+        # Don't wait for timed-out stragglers
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return results, errors
@@ -0,0 +1,150 @@
+# fill_tracker.py
+import time
+import threading
+from collections import deque, OrderedDict
+
+import numpy as np
+
+from broker_state import position_book, account_snapshot
+from trading_config import ORDER_PARAMS
+
+class LocalTradeUpdatePublisher:
+    """In-process stand-in for Alpaca's trade update stream.
+
+    The simulated broker publishes events here; subscribers receive them
+    synchronously, in the same shape as alpaca TradeUpdate objects
+    (event, order, price, qty, timestamp).
+    """
+
+    def __init__(self):
+        self._handlers = []
+
+    def subscribe(self, handler):
+        self._handlers.append(handler)
+
+    def publish(self, update):
+        for handler in list(self._handlers):
+            handler(update)
+
+def _event_name(update):
+    event = update.event
+    return getattr(event, "value", event)
+
+def _event_time(update):
+    """Event time as epoch seconds, or None if the update carries none"""
+    timestamp = getattr(update, "timestamp", None)
+    return timestamp.timestamp() if hasattr(timestamp, "timestamp") else None
+
+class FillTracker:
+    """Tracks our orders' fills from trade update events.
+
+    Keeps actual fill prices per client_order_id, applies fills to the
+    position book, invalidates the account snapshot and measures
+    submit-to-fill latency. Listeners get (update, fill) for every fill.
+    """
+
+    def __init__(self):
+        self.active = False
+        self.fills = OrderedDict()  # client_order_id -> fill info (recent orders)
+        self._submitted = {}     # client_order_id -> perf_counter at submit
+        self._listeners = []
+        self._latencies = deque(maxlen=ORDER_PARAMS["latency_history"])
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def expect(self, client_order_id):
+        """Note the submit time of an order we are about to send"""
+        with self._lock:
+            self._submitted[client_order_id] = time.perf_counter()
+
+    def get_fill(self, client_order_id):
+        with self._lock:
+            fill = self.fills.get(client_order_id)
+            return dict(fill) if fill else None
+
+    def on_trade_update(self, update):
+        """Handle one trade update event (local publisher or Alpaca stream)"""
+        event = _event_name(update)
+        if event in ("canceled", "rejected", "expired"):
+            with self._lock:
+                self._submitted.pop(update.order.client_order_id, None)
+            return
+        if event not in ("fill", "partial_fill"):
+            return
+
+        order = update.order
+        client_order_id = order.client_order_id
+        side = getattr(order.side, "value", order.side)
+        filled_qty = float(order.filled_qty or 0)
+        avg_price = float(order.filled_avg_price or update.price)
+
+        with self._lock:
+            previous = self.fills.get(client_order_id, {}).get("filled_qty", 0.0)
+            submitted = self._submitted.pop(client_order_id, None) if event == "fill" else self._submitted.get(client_order_id)
+            latency_ms = (time.perf_counter() - submitted) * 1000 if submitted else None
+            fill = {
+                "symbol": order.symbol,
+                "side": side,
+                "filled_qty": filled_qty,
+                "filled_avg_price": avg_price,
+                "complete": event == "fill",
+                "latency_ms": latency_ms,
+            }
+            self.fills[client_order_id] = fill
+            self.fills.move_to_end(client_order_id)
+            while len(self.fills) > ORDER_PARAMS["latency_history"]:
+                self.fills.popitem(last=False)
+            if latency_ms is not None and event == "fill":
+                self._latencies.append(latency_ms)
+
+        if filled_qty > previous:
+            # A fill from before the last reconcile is already in the synced book
+            position_book.apply_fill(order.symbol, side, filled_qty - previous, float(update.price or avg_price),
+                                     filled_at=_event_time(update))
+        account_snapshot.invalidate()
+
+        for listener in list(self._listeners):
+            try:
+                listener(update, dict(fill))
+            except Exception as e:
+                print(f"❌ Fill listener error: {e}")
+
+    def attach(self, publisher):
+        """Subscribe to a LocalTradeUpdatePublisher"""
+        publisher.subscribe(self.on_trade_update)
+        self.active = True
+
+    def start_alpaca_stream(self, api_key, secret_key, paper=True):
+        """Subscribe to Alpaca's trade updates websocket on a daemon thread"""
+        from alpaca.trading.stream import TradingStream
+
+        if self.active:
+            return None
+
+        stream = TradingStream(api_key, secret_key, paper=paper)
+
+        async def handler(update):
+            self.on_trade_update(update)
+
+        stream.subscribe_trade_updates(handler)
+        threading.Thread(target=stream.run, name="alpaca-trade-updates", daemon=True).start()
+        self.active = True
+        return stream
+
+    def latency_stats(self):
+        """Submit-to-fill latency summary over recent fills"""
+        with self._lock:
+            latencies = np.array(self._latencies)
+        if not len(latencies):
+            return {"fills": 0}
+        return {
+            "fills": len(latencies),
+            "mean_ms": float(latencies.mean()),
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p95_ms": float(np.percentile(latencies, 95)),
+            "max_ms": float(latencies.max()),
+        }
+
+fill_tracker = FillTracker()
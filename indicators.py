@@ -0,0 +1,177 @@
+# indicators.py
+import threading
+from collections import deque
+
+import pandas as pd
+
+from trading_config import TECHNICAL_PARAMS
+
+# Streaming indicators: each update is O(1). The latest bar of an intraday
+# feed is still forming, so every indicator can also revise its last value
+# in place instead of treating the refreshed bar as a new one.
+
+class RollingMean:
+    """Simple moving average over a fixed window"""
+
+    def __init__(self, window):
+        self.window = window
+        self._values = deque()
+        self._sum = 0.0
+
+    def update(self, value):
+        self._values.append(value)
+        self._sum += value
+        if len(self._values) > self.window:
+            self._sum -= self._values.popleft()
+        return self.value
+
+    def revise(self, value):
+        """Replace the most recent value"""
+        self._sum += value - self._values[-1]
+        self._values[-1] = value
+        return self.value
+
+    @property
+    def value(self):
+        if len(self._values) < self.window:
+            return None
+        return self._sum / self.window
+
+    @property
+    def partial_value(self):
+        """Mean of the values seen so far, even before the window is full"""
+        return self._sum / len(self._values) if self._values else None
+
+class WilderRSI:
+    """Relative Strength Index with Wilder's smoothing"""
+
+    def __init__(self, period):
+        self.period = period
+        self._prev_close = None
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+        self._count = 0
+        self._before_last = None
+
+    def _apply(self, close):
+        if self._prev_close is not None:
+            delta = close - self._prev_close
+            gain, loss = max(delta, 0.0), max(-delta, 0.0)
+            self._count += 1
+            if self._count <= self.period:
+                # Seed with a simple average of the first `period` moves
+                self._avg_gain += (gain - self._avg_gain) / self._count
+                self._avg_loss += (loss - self._avg_loss) / self._count
+            else:
+                self._avg_gain = (self._avg_gain * (self.period - 1) + gain) / self.period
+                self._avg_loss = (self._avg_loss * (self.period - 1) + loss) / self.period
+        self._prev_close = close
+
+    def update(self, close):
+        self._before_last = (self._prev_close, self._avg_gain, self._avg_loss, self._count)
+        self._apply(close)
+        return self.value
+
+    def revise(self, close):
+        """Replace the most recent close"""
+        self._prev_close, self._avg_gain, self._avg_loss, self._count = self._before_last
+        self._apply(close)
+        return self.value
+
+    @property
+    def value(self):
+        if self._count < self.period:
+            return None
+        if self._avg_loss == 0:
+            return 100.0
+        rs = self._avg_gain / self._avg_loss
+        return 100 - (100 / (1 + rs))
+
+class TickerIndicators:
+    """Indicator state for one ticker/interval, fed one bar at a time"""
+
+    def __init__(self, sma_short=None, sma_long=None, rsi_period=None, volume_window=None):
+        self.sma_short = RollingMean(sma_short or TECHNICAL_PARAMS["sma_short"])
+        self.sma_long = RollingMean(sma_long or TECHNICAL_PARAMS["sma_long"])
+        self.rsi = WilderRSI(rsi_period or TECHNICAL_PARAMS["rsi_period"])
+        self.volume = RollingMean(volume_window or TECHNICAL_PARAMS["volume_window"])
+        self.last_timestamp = None
+        self.close = None
+        self.prev_close = None
+        self.last_volume = None
+
+    def update(self, timestamp, close, volume):
+        """Add a bar, or revise the last one if it has the same timestamp"""
+        close, volume = float(close), float(volume)
+        if self.last_timestamp is not None and timestamp == self.last_timestamp:
+            self.sma_short.revise(close)
+            self.sma_long.revise(close)
+            self.rsi.revise(close)
+            self.volume.revise(volume)
+        else:
+            self.prev_close = self.close
+            self.sma_short.update(close)
+            self.sma_long.update(close)
+            self.rsi.update(close)
+            self.volume.update(volume)
+            self.last_timestamp = timestamp
+        self.close = close
+        self.last_volume = volume
+
+    def update_from_bars(self, hist):
+        """Feed only the bars at or after the last one already seen"""
+        if hist is None or hist.empty:
+            return self
+        if self.last_timestamp is not None:
+            hist = hist[hist.index >= self.last_timestamp]
+        for timestamp, close, volume in zip(hist.index, hist['Close'], hist['Volume']):
+            self.update(timestamp, close, volume)
+        return self
+
+    @property
+    def change_pct(self):
+        if not self.prev_close:
+            return None
+        return ((self.close - self.prev_close) / self.prev_close) * 100
+
+    @property
+    def volume_ratio(self):
+        avg_volume = self.volume.partial_value
+        return self.last_volume / avg_volume if avg_volume else 1
+
+    def values(self):
+        return {
+            'price': self.close,
+            'change_pct': self.change_pct,
+            'sma_short': self.sma_short.value,
+            'sma_long': self.sma_long.value,
+            'rsi': self.rsi.value,
+            'volume_ratio': self.volume_ratio,
+        }
+
+class IndicatorBook:
+    """Per-ticker indicator states for one bar interval"""
+
+    def __init__(self, **params):
+        self.params = params
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def update(self, ticker, hist):
+        """Bring a ticker's state up to date with a bar frame and return its values"""
+        with self._lock:
+            if ticker not in self._states:
+                self._states[ticker] = TickerIndicators(**self.params)
+            return self._states[ticker].update_from_bars(hist).values()
+
+    def get(self, ticker):
+        return self._states.get(ticker)
+
+def indicator_frame(hist, **params):
+    """Full SMA/RSI series for a bar frame, e.g. for charting"""
+    state = TickerIndicators(**params)
+    rows = []
+    for timestamp, close, volume in zip(hist.index, hist['Close'], hist['Volume']):
+        state.update(timestamp, close, volume)
+        rows.append((state.sma_short.value, state.sma_long.value, state.rsi.value))
+    return pd.DataFrame(rows, index=hist.index, columns=['SMA_short', 'SMA_long', 'RSI'], dtype=float)
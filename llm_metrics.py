@@ -0,0 +1,269 @@
+# llm_metrics.py
+"""LLM call instrumentation.
+
+LLMMetricsHandler is a LangChain callback handler: pass one per decision in
+config={"callbacks": [handler]} and it times every model and tool step,
+reads token usage from the model responses and counts tool calls, retries
+and errors. Retries are only visible for models wrapped with
+with_counted_retries (client-internal retries fire no callbacks). Model time spent inside a tool (a news summary called by
+get_financial_news) counts as model time only, so llm_ms and tool_ms never
+overlap. Every step is also fed into the process-wide LLMMetrics
+aggregator, which keeps latency histograms by ticker and by cycle. Nested
+calls that should be told apart (e.g. news summaries inside a decision)
+carry a "step:<name>" tag in their run config.
+"""
+import time
+import uuid
+import threading
+from collections import defaultdict, deque
+
+import numpy as np
+from langchain_core.callbacks import BaseCallbackHandler
+
+from trading_config import LLM_METRICS_PARAMS
+
+def new_cycle_id():
+    return uuid.uuid4().hex[:12]
+
+def _usage(response):
+    """(prompt_tokens, completion_tokens) from an LLMResult"""
+    prompt_tokens = completion_tokens = 0
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                prompt_tokens += usage.get("input_tokens", 0)
+                completion_tokens += usage.get("output_tokens", 0)
+    if not (prompt_tokens or completion_tokens):
+        # Older integrations report usage in llm_output instead
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        prompt_tokens = usage.get("prompt_tokens", 0)
+        completion_tokens = usage.get("completion_tokens", 0)
+    return prompt_tokens, completion_tokens
+
+def estimate_cost(prompt_tokens, completion_tokens):
+    """USD estimate from the configured per-million-token prices"""
+    return (prompt_tokens * LLM_METRICS_PARAMS["input_cost_per_mtok"]
+            + completion_tokens * LLM_METRICS_PARAMS["output_cost_per_mtok"]) / 1_000_000
+
+# Handler totals that add up across the decisions of one call
+ADDITIVE_FIELDS = ["llm_calls", "llm_ms", "prompt_tokens", "completion_tokens",
+                   "tool_calls", "tool_ms", "retries", "errors", "cost_usd"]
+
+RETRY_TAG_PREFIX = "retry:attempt:"
+
+def with_counted_retries(runnable, max_retries):
+    """Retry a runnable in LangChain rather than inside the model client, so
+    every retry starts a run tagged retry:attempt:N that handlers can count.
+    The wrapped model should be built with max_retries=0."""
+    return runnable.with_retry(stop_after_attempt=max_retries + 1)
+
+def per_decision_share(call_totals):
+    """A batched call's totals divided evenly over its batch_size decisions"""
+    batch_size = call_totals.get("batch_size") or 1
+    share = dict(call_totals)
+    for field in ADDITIVE_FIELDS:
+        if field in share:
+            share[field] = round(share[field] / batch_size, 6)
+    return share
+
+class LLMMetricsHandler(BaseCallbackHandler):
+    """Per-invocation LLM/tool step metrics for one ticker and cycle"""
+
+    def __init__(self, ticker=None, cycle_id=None, step=None, metrics=None):
+        self.ticker = ticker
+        self.cycle_id = cycle_id
+        self.step = step
+        self.metrics = metrics
+        self.llm_calls = 0
+        self.llm_ms = 0.0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.tool_calls = []   # (tool name, inputs)
+        self.tool_ms = 0.0
+        self.retries = 0
+        self.errors = 0
+        self._started = {}     # run_id -> perf_counter
+        self._parents = {}     # run_id -> parent_run_id, for runs in flight
+        self._nested_llm_ms = defaultdict(float)  # tool run_id -> model time inside it
+        self._lock = threading.Lock()
+
+    def _start(self, run_id, parent_run_id=None):
+        with self._lock:
+            self._started[run_id] = time.perf_counter()
+            self._parents[run_id] = parent_run_id
+
+    def _elapsed_ms(self, run_id):
+        with self._lock:
+            started = self._started.pop(run_id, None)
+            self._parents.pop(run_id, None)
+        return (time.perf_counter() - started) * 1000 if started else 0.0
+
+    def _count_retry(self, tags):
+        # Only the first run of each retried attempt carries the tag
+        if any(tag.startswith(RETRY_TAG_PREFIX) for tag in tags or []):
+            with self._lock:
+                self.retries += 1
+
+    def _enclosing_tool(self, run_id):
+        """run_id of the tool run this run is nested in, if any (lock held)"""
+        parent = self._parents.get(run_id)
+        while parent is not None:
+            if parent in self._nested_llm_ms:
+                return parent
+            parent = self._parents.get(parent)
+        return None
+
+    def _record(self, kind, latency_ms):
+        if self.metrics:
+            self.metrics.record_step(kind, latency_ms, ticker=self.ticker, cycle_id=self.cycle_id)
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, tags=None, **kwargs):
+        with self._lock:
+            self._parents[run_id] = parent_run_id
+        self._count_retry(tags)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        with self._lock:
+            self._parents.pop(run_id, None)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        with self._lock:
+            self._parents.pop(run_id, None)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, tags=None, **kwargs):
+        self._start(run_id, parent_run_id)
+        self._count_retry(tags)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, tags=None, **kwargs):
+        self._start(run_id, parent_run_id)
+        self._count_retry(tags)
+
+    def on_llm_end(self, response, *, run_id, tags=None, **kwargs):
+        with self._lock:
+            tool_run_id = self._enclosing_tool(run_id)
+        latency_ms = self._elapsed_ms(run_id)
+        step = next((tag[5:] for tag in tags or [] if tag.startswith("step:")), None)
+        prompt_tokens, completion_tokens = _usage(response)
+        with self._lock:
+            if tool_run_id is not None:
+                self._nested_llm_ms[tool_run_id] += latency_ms
+            self.llm_calls += 1
+            self.llm_ms += latency_ms
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+        self._record(step or self.step or "llm", latency_ms)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._elapsed_ms(run_id)
+        with self._lock:
+            self.errors += 1
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, inputs=None, **kwargs):
+        self._start(run_id, parent_run_id)
+        with self._lock:
+            self._nested_llm_ms[run_id] = 0.0
+            self.tool_calls.append(((serialized or {}).get("name") or kwargs.get("name"), inputs or input_str))
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        latency_ms = self._elapsed_ms(run_id)
+        with self._lock:
+            # Model time inside the tool is already in llm_ms
+            latency_ms = max(0.0, latency_ms - self._nested_llm_ms.pop(run_id, 0.0))
+            self.tool_ms += latency_ms
+        self._record("tool", latency_ms)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._elapsed_ms(run_id)
+        with self._lock:
+            self._nested_llm_ms.pop(run_id, None)
+            self.errors += 1
+
+    def totals(self):
+        """Summary to attach to a decision record"""
+        with self._lock:
+            return {
+                "llm_calls": self.llm_calls,
+                "llm_ms": round(self.llm_ms, 1),
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "tool_calls": len(self.tool_calls),
+                "tool_ms": round(self.tool_ms, 1),
+                "retries": self.retries,
+                "errors": self.errors,
+                "cost_usd": round(estimate_cost(self.prompt_tokens, self.completion_tokens), 6),
+                "cycle_id": self.cycle_id,
+            }
+
+class LLMMetrics:
+    """Process-wide step latencies and token totals, grouped by ticker and cycle"""
+
+    def __init__(self, bins_ms, history):
+        self.bins_ms = list(bins_ms) + [np.inf]
+        self.history = history
+        self._steps = deque(maxlen=history)  # (kind, latency_ms, ticker, cycle_id)
+        self._tokens = defaultdict(lambda: [0, 0])  # ticker -> [prompt, completion]
+        self._lock = threading.Lock()
+
+    def handler(self, ticker=None, cycle_id=None, step=None):
+        """A callback handler that reports into this aggregator"""
+        return LLMMetricsHandler(ticker=ticker, cycle_id=cycle_id, step=step, metrics=self)
+
+    def record_step(self, kind, latency_ms, ticker=None, cycle_id=None):
+        with self._lock:
+            self._steps.append((kind, latency_ms, ticker, cycle_id))
+
+    def record_tokens(self, ticker, prompt_tokens, completion_tokens):
+        with self._lock:
+            totals = self._tokens[ticker]
+            totals[0] += prompt_tokens
+            totals[1] += completion_tokens
+
+    def histograms(self, by="ticker", kind=None):
+        """{group: {"counts", "bins_ms", "p50_ms", "p95_ms"}} of step latencies;
+        by is "ticker" or "cycle", kind filters to e.g. "llm" or "tool"."""
+        position = 2 if by == "ticker" else 3
+        with self._lock:
+            steps = [s for s in self._steps if kind is None or s[0] == kind]
+        groups = defaultdict(list)
+        for step in steps:
+            groups[step[position]].append(step[1])
+
+        result = {}
+        for group, latencies in groups.items():
+            latencies = np.array(latencies)
+            counts, _ = np.histogram(latencies, bins=self.bins_ms)
+            result[group] = {
+                "counts": counts.tolist(),
+                "bins_ms": self.bins_ms[:-1],
+                "p50_ms": float(np.percentile(latencies, 50)),
+                "p95_ms": float(np.percentile(latencies, 95)),
+            }
+        return result
+
+    def token_totals(self):
+        with self._lock:
+            return {
+                ticker: {
+                    "prompt_tokens": prompt,
+                    "completion_tokens": completion,
+                    "cost_usd": round(estimate_cost(prompt, completion), 6),
+                } for ticker, (prompt, completion) in self._tokens.items()
+            }
+
+    def finish(self, handler, tickers=None):
+        """Fold a finished handler's token usage into the per-ticker totals;
+        a call made for several tickers is split evenly across them"""
+        if not tickers:
+            self.record_tokens(handler.ticker, handler.prompt_tokens, handler.completion_tokens)
+            return handler.totals()
+        prompt_share, prompt_extra = divmod(handler.prompt_tokens, len(tickers))
+        completion_share, completion_extra = divmod(handler.completion_tokens, len(tickers))
+        for i, ticker in enumerate(tickers):
+            self.record_tokens(ticker, prompt_share + (i < prompt_extra), completion_share + (i < completion_extra))
+        return handler.totals()
+
+llm_metrics = LLMMetrics(
+    bins_ms=LLM_METRICS_PARAMS["histogram_bins_ms"],
+    history=LLM_METRICS_PARAMS["history"],
+)
@@ -0,0 +1,411 @@
+# market_data.py
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+
+import yfinance as yf
+import pandas as pd
+
+from trading_config import MARKET_DATA_PARAMS
+from fetch_engine import fetch_concurrently, rate_limited
+from bar_store import BarStore
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+class BarCache:
+    """In-process LRU cache of bar frames keyed by (ticker, period, interval).
+
+    Entries expire after a per-interval TTL. Cached frames are shared between
+    callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries, ttl_seconds, default_ttl):
+        self.max_entries = max_entries
+        self.ttl_seconds = dict(ttl_seconds)
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _ttl(self, interval):
+        return self.ttl_seconds.get(interval, self.default_ttl)
+
+    def get(self, ticker, period, interval):
+        """Return the cached frame, or None if missing or expired"""
+        key = (ticker, period, interval)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self._ttl(interval):
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, ticker, period, interval, frame):
+        """Store a frame, evicting the least recently used entries if full"""
+        key = (ticker, period, interval)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), frame)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+bar_cache = BarCache(
+    max_entries=MARKET_DATA_PARAMS["cache_max_entries"],
+    ttl_seconds=MARKET_DATA_PARAMS["cache_ttl_seconds"],
+    default_ttl=MARKET_DATA_PARAMS["cache_default_ttl_seconds"],
+)
+
+def _chunks(items, size):
+    """Yield successive chunks of a list"""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def _split_download(data, tickers):
+    """Split a yf.download frame into one OHLCV frame per ticker"""
+    frames = {}
+    if data is None or data.empty:
+        return frames
+
+    if isinstance(data.columns, pd.MultiIndex):
+        available = set(data.columns.get_level_values(0))
+        for ticker in tickers:
+            if ticker not in available:
+                continue
+            frame = data[ticker].dropna(how="all")
+            if not frame.empty:
+                frames[ticker] = frame[[c for c in OHLCV_COLUMNS if c in frame.columns]]
+    elif len(tickers) == 1:
+        frame = data.dropna(how="all")
+        if not frame.empty:
+            frames[tickers[0]] = frame[[c for c in OHLCV_COLUMNS if c in frame.columns]]
+
+    return frames
+
+class MarketDataProvider:
+    """Source of bars, last prices and fundamentals.
+
+    Subclasses implement get_bars and get_fundamentals; batch and last-price
+    lookups fall back to per-ticker get_bars calls.
+    """
+
+    name = "base"
+
+    def get_bars(self, ticker, period="1d", interval="1d"):
+        """OHLCV DataFrame for one ticker"""
+        raise NotImplementedError
+
+    def get_bars_batch(self, tickers, period="1d", interval="1d"):
+        """Dict of ticker -> OHLCV DataFrame; tickers without data are left out"""
+        bars = {}
+        for ticker in tickers:
+            hist = self.get_bars(ticker, period=period, interval=interval)
+            if hist is not None and not hist.empty:
+                bars[ticker] = hist
+        return bars
+
+    def get_bars_since(self, ticker, start, interval="1d"):
+        """OHLCV bars at or after start (a UTC Timestamp)"""
+        hist = self.get_bars(ticker, period="5d", interval=interval)
+        return hist[hist.index >= start]
+
+    def get_bars_batch_since(self, tickers, start, interval="1d"):
+        """Dict of ticker -> bars at or after start"""
+        bars = {}
+        for ticker in tickers:
+            hist = self.get_bars_since(ticker, start, interval=interval)
+            if hist is not None and not hist.empty:
+                bars[ticker] = hist
+        return bars
+
+    def now(self):
+        """Current time as seen by this provider (UTC Timestamp)"""
+        return pd.Timestamp.now(tz="UTC")
+
+    def get_last_price(self, ticker):
+        """Latest close price"""
+        hist = self.get_bars(ticker, period="1d", interval="1d")
+        return float(hist["Close"].iloc[-1])
+
+    def get_fundamentals(self, ticker):
+        """yfinance-style info dict (longName, sector, marketCap, ...)"""
+        raise NotImplementedError
+
+class YFinanceProvider(MarketDataProvider):
+    """Live Yahoo Finance data"""
+
+    name = "yfinance"
+
+    def get_bars(self, ticker, period="1d", interval="1d"):
+        return yf.Ticker(ticker).history(period=period, interval=interval)
+
+    def get_bars_batch(self, tickers, period="1d", interval="1d"):
+        tickers = list(tickers)
+        data = yf.download(
+            tickers=tickers,
+            period=period,
+            interval=interval,
+            group_by="ticker",
+            auto_adjust=True,
+            threads=True,
+            progress=False,
+        )
+        return _split_download(data, tickers)
+
+    def get_bars_since(self, ticker, start, interval="1d"):
+        return yf.Ticker(ticker).history(start=start, interval=interval)
+
+    def get_bars_batch_since(self, tickers, start, interval="1d"):
+        tickers = list(tickers)
+        data = yf.download(
+            tickers=tickers,
+            start=start,
+            interval=interval,
+            group_by="ticker",
+            auto_adjust=True,
+            threads=True,
+            progress=False,
+        )
+        return _split_download(data, tickers)
+
+    def get_fundamentals(self, ticker):
+        return yf.Ticker(ticker).info
+
+class ReplayProvider(MarketDataProvider):
+    """Serves recorded bars from disk with no network access.
+
+    Bars are read from <data_dir>/<TICKER>_<interval>.csv (as written by
+    record_bars) and fundamentals from <data_dir>/fundamentals.json. An
+    optional replay clock hides bars after the current replay time, so a
+    recorded session can be stepped through deterministically.
+    """
+
+    name = "replay"
+
+    def __init__(self, data_dir, clock=None):
+        self.data_dir = data_dir
+        self.clock = pd.Timestamp(clock) if clock is not None else None
+        self._frames = {}
+        self._fundamentals = None
+        self._lock = threading.Lock()
+
+    def _load(self, ticker, interval):
+        key = (ticker, interval)
+        with self._lock:
+            if key not in self._frames:
+                path = os.path.join(self.data_dir, f"{ticker}_{interval}.csv")
+                if os.path.exists(path):
+                    frame = pd.read_csv(path, index_col=0)
+                    frame.index = pd.to_datetime(frame.index, utc=True)
+                    self._frames[key] = frame.sort_index()
+                else:
+                    self._frames[key] = pd.DataFrame(columns=OHLCV_COLUMNS)
+            return self._frames[key]
+
+    def set_clock(self, timestamp):
+        """Move the replay clock; None serves the whole recording"""
+        self.clock = pd.Timestamp(timestamp) if timestamp is not None else None
+        bar_cache.clear()
+
+    def advance(self, seconds):
+        """Step the replay clock forward"""
+        if self.clock is not None:
+            self.clock += pd.Timedelta(seconds=seconds)
+            bar_cache.clear()
+
+    def now(self):
+        if self.clock is None:
+            return super().now()
+        return self.clock if self.clock.tzinfo else self.clock.tz_localize("UTC")
+
+    def _visible(self, ticker, interval):
+        frame = self._load(ticker, interval)
+        if self.clock is not None and not frame.empty:
+            clock = self.clock if self.clock.tzinfo else self.clock.tz_localize("UTC")
+            frame = frame[frame.index <= clock]
+        return frame
+
+    def get_bars(self, ticker, period="1d", interval="1d"):
+        return _slice_period(self._visible(ticker, interval), period).copy()
+
+    def get_bars_since(self, ticker, start, interval="1d"):
+        frame = self._visible(ticker, interval)
+        return frame[frame.index >= start].copy()
+
+    def get_fundamentals(self, ticker):
+        with self._lock:
+            if self._fundamentals is None:
+                path = os.path.join(self.data_dir, "fundamentals.json")
+                self._fundamentals = {}
+                if os.path.exists(path):
+                    with open(path, "r") as f:
+                        self._fundamentals = json.load(f)
+        return dict(self._fundamentals.get(ticker, {}))
+
+def _slice_period(frame, period):
+    """Keep the trailing yfinance-style period ("1d", "5d", "3mo", "1y", "max")"""
+    if frame.empty or period in (None, "max"):
+        return frame
+
+    if period.endswith("d"):
+        days = sorted(set(frame.index.normalize()))[-int(period[:-1]):]
+        return frame[frame.index.normalize() >= days[0]]
+
+    last = frame.index[-1]
+    if period == "ytd":
+        start = last.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    elif period.endswith("mo"):
+        start = last - pd.DateOffset(months=int(period[:-2]))
+    elif period.endswith("y"):
+        start = last - pd.DateOffset(years=int(period[:-1]))
+    elif period.endswith("wk"):
+        start = last - pd.Timedelta(weeks=int(period[:-2]))
+    else:
+        return frame
+    return frame[frame.index > start]
+
+_provider = None
+_provider_lock = threading.Lock()
+
+def get_provider():
+    """The process-wide market data provider.
+
+    Chosen from the MARKET_DATA_PROVIDER env var (falling back to
+    MARKET_DATA_PARAMS["provider"]): "yfinance" or "replay".
+    """
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            name = os.environ.get("MARKET_DATA_PROVIDER", MARKET_DATA_PARAMS["provider"])
+            if name == "replay":
+                replay_dir = os.environ.get("MARKET_DATA_REPLAY_DIR", MARKET_DATA_PARAMS["replay_dir"])
+                _provider = ReplayProvider(replay_dir)
+            else:
+                _provider = YFinanceProvider()
+        return _provider
+
+def set_provider(provider):
+    """Swap the market data provider (e.g. for replay benchmarks)"""
+    global _provider
+    with _provider_lock:
+        _provider = provider
+    bar_cache.clear()
+
+bar_store = BarStore(MARKET_DATA_PARAMS["bar_store_dir"]) if MARKET_DATA_PARAMS["bar_store_dir"] else None
+
+def _use_store(period):
+    return bar_store is not None and period in MARKET_DATA_PARAMS["bar_store_periods"]
+
+def fetch_bars_batch(tickers, period="1d", interval="5m", chunk_size=None, use_cache=True, use_store=True):
+    """Download OHLCV bars for many tickers in a few bulk requests.
+
+    Returns a dict mapping ticker -> DataFrame with Open/High/Low/Close/Volume.
+    Series already in the bar cache are served from it; only the misses are
+    downloaded. Tickers with no data are left out. use_cache=False bypasses
+    the cache entirely and use_store=False the on-disk bar store (one-off
+    sweeps that would only churn them).
+    """
+    tickers = list(dict.fromkeys(tickers))
+    chunk_size = chunk_size or MARKET_DATA_PARAMS["batch_chunk_size"]
+    bars = {}
+    missing = []
+
+    for ticker in tickers:
+        cached = bar_cache.get(ticker, period, interval) if use_cache else None
+        if cached is None:
+            missing.append(ticker)
+        elif not cached.empty:
+            bars[ticker] = cached
+
+    provider = get_provider()
+
+    def download(chunk):
+        if use_store and _use_store(period):
+            # Only bars newer than what is on disk go over the network
+            return bar_store.refresh(provider, chunk, period, interval)
+        return provider.get_bars_batch(list(chunk), period=period, interval=interval)
+
+    # Chunks are downloaded in parallel; a failed chunk doesn't sink the rest
+    chunks = [tuple(chunk) for chunk in _chunks(missing, chunk_size)]
+    downloaded, errors = fetch_concurrently(download, chunks, provider=provider.name)
+
+    for chunk, e in errors.items():
+        print(f"❌ Batch download failed for {len(chunk)} tickers: {e}")
+
+    for chunk, frames in downloaded.items():
+        for ticker in chunk:
+            frame = frames.get(ticker, pd.DataFrame(columns=OHLCV_COLUMNS))
+            if use_cache:
+                bar_cache.put(ticker, period, interval, frame)
+            if not frame.empty:
+                bars[ticker] = frame
+
+    return bars
+
+def get_bars(ticker, period="1d", interval="1d"):
+    """Get OHLCV bars for one ticker through the shared bar cache"""
+    cached = bar_cache.get(ticker, period, interval)
+    if cached is not None:
+        return cached
+
+    provider = get_provider()
+    rate_limited(provider.name)  # Shares the limit with batched downloads
+    if _use_store(period):
+        frames = bar_store.refresh(provider, [ticker], period, interval)
+        hist = frames.get(ticker, pd.DataFrame(columns=OHLCV_COLUMNS))
+    else:
+        hist = provider.get_bars(ticker, period=period, interval=interval)
+    bar_cache.put(ticker, period, interval, hist)
+    return hist
+
+def record_bars(tickers, data_dir, period="1d", interval="2m", fundamentals=False):
+    """Record bars from the live provider into a ReplayProvider directory"""
+    os.makedirs(data_dir, exist_ok=True)
+    live = YFinanceProvider()
+    bars = live.get_bars_batch(list(tickers), period=period, interval=interval)
+
+    for ticker, hist in bars.items():
+        hist[[c for c in OHLCV_COLUMNS if c in hist.columns]].to_csv(
+            os.path.join(data_dir, f"{ticker}_{interval}.csv")
+        )
+
+    if fundamentals:
+        path = os.path.join(data_dir, "fundamentals.json")
+        info = {}
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                info = json.load(f)
+        for ticker in tickers:
+            try:
+                info[ticker] = live.get_fundamentals(ticker)
+            except Exception as e:
+                print(f"❌ Fundamentals failed for {ticker}: {e}")
+        with open(path, "w") as f:
+            json.dump(info, f, indent=2, default=str)
+
+    print(f"💾 Recorded {len(bars)} {interval} series to {data_dir}")
+    return list(bars)
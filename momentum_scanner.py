@@ -1,12 +1,94 @@
 # momentum_scanner.py
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import requests
 import os
+import time
+import heapq
 from newsapi import NewsApiClient
 
+from market_data import fetch_bars_batch
+from fetch_engine import fetch_concurrently
+from trading_config import FETCH_PARAMS, SCANNER_PARAMS
+
+# Stats from the most recent large-universe scan
+last_scan_stats = {}
+
+def bars_to_matrix(bars):
+    """Stack per-ticker bar frames into (tickers x bars) close/volume matrices.
+    
+    Series are right-aligned on their latest bar; shorter histories are
+    padded with NaN on the left.
+    """
+    tickers = list(bars)
+    width = max((len(hist) for hist in bars.values()), default=0)
+    close = np.full((len(tickers), width), np.nan)
+    volume = np.full((len(tickers), width), np.nan)
+    
+    for i, ticker in enumerate(tickers):
+        hist = bars[ticker]
+        n = len(hist)
+        if n:
+            close[i, width - n:] = hist['Close'].to_numpy(dtype=float)
+            volume[i, width - n:] = hist['Volume'].to_numpy(dtype=float)
+    
+    return tickers, close, volume
+
+def _row_nanmean(matrix):
+    """Row means ignoring NaN (NaN for empty rows, without warnings)"""
+    counts = np.sum(~np.isnan(matrix), axis=1)
+    sums = np.nansum(matrix, axis=1)
+    return np.divide(sums, counts, out=np.full(len(matrix), np.nan), where=counts > 0)
+
+def score_momentum(close, volume, volume_window=None):
+    """Cross-sectional momentum metrics for every ticker in one pass.
+    
+    Takes (tickers x bars) close and volume matrices and returns a dict of
+    per-ticker arrays: price, change_pct, volume_ratio, above_mean,
+    is_active and momentum_score. volume_window limits the volume average
+    to the trailing N bars (default: whole history).
+    """
+    close = np.asarray(close, dtype=float)
+    volume = np.asarray(volume, dtype=float)
+    
+    price = close[:, -1]
+    prev_price = close[:, -2]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change_pct = (price - prev_price) / prev_price * 100
+    
+    avg_volume = _row_nanmean(volume if volume_window is None else volume[:, -volume_window:])
+    volume_ratio = np.ones(len(volume))
+    np.divide(volume[:, -1], avg_volume, out=volume_ratio, where=avg_volume > 0)
+    
+    above_mean = price > _row_nanmean(close)
+    
+    # Momentum criteria: price moving, high volume, or above average
+    is_active = (np.abs(change_pct) > 0.1) | (volume_ratio > 1.2) | above_mean
+    
+    return {
+        'price': price,
+        'change_pct': change_pct,
+        'volume_ratio': volume_ratio,
+        'above_mean': above_mean,
+        'is_active': is_active,
+        'momentum_score': np.abs(change_pct) + volume_ratio,
+    }
+
+def top_k_indices(scores, k, mask=None):
+    """Indices of the k highest finite scores (optionally within mask), best first"""
+    scores = np.asarray(scores, dtype=float)
+    eligible = np.isfinite(scores)
+    if mask is not None:
+        eligible &= mask
+    candidates = np.flatnonzero(eligible)
+    
+    if len(candidates) > k:
+        # Partial selection is O(n); only the k winners get sorted
+        candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+    
+    return candidates[np.argsort(-scores[candidates], kind='stable')]
+
 def get_active_stocks(count=15):
     """Get actively trading stocks with momentum and news"""
     print("🔍 Scanning for active momentum stocks...")
@@ -21,48 +103,93 @@ def get_active_stocks(count=15):
         "JNJ", "PFE", "MRK", "ABT", "LLY", "TMO", "DHR"
     ]
     
-    active_stocks = []
-    
-    for ticker in stock_universe[:25]:  # Check first 25 for speed
-        try:
-            stock = yf.Ticker(ticker)
-            hist = stock.history(period="1d", interval="5m")
-            
-            if len(hist) < 2:
-                continue
-                
-            # Calculate momentum indicators
-            current_price = hist['Close'].iloc[-1]
-            prev_price = hist['Close'].iloc[-2]
-            price_change_pct = ((current_price - prev_price) / prev_price) * 100
-            
-            volume = hist['Volume'].iloc[-1]
-            avg_volume = hist['Volume'].mean()
-            volume_ratio = volume / avg_volume if avg_volume > 0 else 1
-            
-            # Momentum criteria
-            is_active = (
-                abs(price_change_pct) > 0.1 or  # Price moving
-                volume_ratio > 1.2 or           # High volume
-                current_price > hist['Close'].mean()  # Above average
-            )
-            
-            if is_active:
-                active_stocks.append({
-                    'ticker': ticker,
-                    'price': current_price,
-                    'change_pct': price_change_pct,
-                    'volume_ratio': volume_ratio,
-                    'momentum_score': abs(price_change_pct) + volume_ratio
-                })
-                
-        except Exception as e:
+    # One bulk download for the whole scan instead of one request per ticker
+    bars = fetch_bars_batch(stock_universe[:25], period="1d", interval="5m")  # Check first 25 for speed
+    if not bars:
+        # Nothing downloaded is a failed scan, not an empty market
+        raise RuntimeError("No bars downloaded for the momentum universe")
+    bars = {ticker: hist for ticker, hist in bars.items() if len(hist) >= 2}
+    
+    selected = []
+    if bars:
+        tickers, close, volume = bars_to_matrix(bars)
+        scores = score_momentum(close, volume)
+        
+        # Top stocks by momentum among the active ones
+        best = top_k_indices(scores['momentum_score'], count, scores['is_active'])
+        selected = [tickers[i] for i in best]
+    
+    print(f"🎯 Selected {len(selected)} active stocks: {selected}")
+    return selected
+
+def iter_universe(path):
+    """Stream symbols from a universe file (one per line or comma-separated, # comments)"""
+    seen = set()
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.split('#', 1)[0]
+            for symbol in line.replace(',', ' ').split():
+                symbol = symbol.strip().upper()
+                if symbol and symbol not in seen:
+                    seen.add(symbol)
+                    yield symbol
+
+def _universe_chunks(symbols, size):
+    chunk = []
+    for symbol in symbols:
+        chunk.append(symbol)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def scan_universe(path=None, count=15, chunk_size=None):
+    """Momentum scan over a large symbol universe read from a file.
+    
+    Symbols are streamed in chunks, so only one chunk of bars is in memory at
+    a time, and only a running top-k heap of candidates is kept across
+    chunks. Throughput is printed and stored in last_scan_stats.
+    """
+    path = path or SCANNER_PARAMS["universe_file"]
+    chunk_size = chunk_size or SCANNER_PARAMS["universe_chunk_size"]
+    print(f"🔍 Scanning universe {path} in chunks of {chunk_size}...")
+    
+    start = time.perf_counter()
+    scanned = 0
+    downloaded = 0
+    top = []  # min-heap of (score, ticker)
+    
+    for chunk in _universe_chunks(iter_universe(path), chunk_size):
+        scanned += len(chunk)
+        bars = fetch_bars_batch(chunk, period="1d", interval="5m", use_cache=False, use_store=False)
+        downloaded += len(bars)
+        bars = {ticker: hist for ticker, hist in bars.items() if len(hist) >= 2}
+        if not bars:
             continue
+        
+        tickers, close, volume = bars_to_matrix(bars)
+        scores = score_momentum(close, volume)
+        for i in top_k_indices(scores['momentum_score'], count, scores['is_active']):
+            entry = (float(scores['momentum_score'][i]), tickers[i])
+            if len(top) < count:
+                heapq.heappush(top, entry)
+            elif entry > top[0]:
+                heapq.heapreplace(top, entry)
     
-    # Sort by momentum and return top stocks
-    active_stocks.sort(key=lambda x: x['momentum_score'], reverse=True)
-    selected = [stock['ticker'] for stock in active_stocks[:count]]
+    if scanned and not downloaded:
+        raise RuntimeError(f"No bars downloaded for any of {scanned} universe tickers")
     
+    elapsed = time.perf_counter() - start
+    selected = [ticker for _, ticker in sorted(top, reverse=True)]
+    
+    last_scan_stats.update({
+        'tickers_scanned': scanned,
+        'seconds': elapsed,
+        'tickers_per_sec': scanned / elapsed if elapsed > 0 else 0.0,
+        'selected': selected,
+    })
+    print(f"⚡ Scanned {scanned} tickers in {elapsed:.1f}s ({last_scan_stats['tickers_per_sec']:.0f} tickers/s)")
     print(f"🎯 Selected {len(selected)} active stocks: {selected}")
     return selected
 
@@ -75,90 +202,73 @@ def get_high_volume_stocks(count=12):
         "MSFT", "GOOGL", "SPY", "QQQ", "NFLX", "MRNA"
     ]
     
-    high_volume = []
-    
-    for ticker in volume_stocks:
-        try:
-            stock = yf.Ticker(ticker)
-            hist = stock.history(period="1d", interval="5m")
-            
-            if len(hist) < 10:
-                continue
-                
-            current_volume = hist['Volume'].iloc[-1]
-            avg_volume = hist['Volume'].tail(10).mean()
-            volume_ratio = current_volume / avg_volume if avg_volume > 0 else 1
-            
-            if volume_ratio > 1.5:  # 50% above average volume
-                high_volume.append({
-                    'ticker': ticker,
-                    'volume_ratio': volume_ratio,
-                    'price': hist['Close'].iloc[-1]
-                })
-                
-        except Exception:
-            continue
+    bars = fetch_bars_batch(volume_stocks, period="1d", interval="5m")
+    if not bars:
+        raise RuntimeError("No bars downloaded for the volume universe")
+    bars = {ticker: hist for ticker, hist in bars.items() if len(hist) >= 10}
     
-    high_volume.sort(key=lambda x: x['volume_ratio'], reverse=True)
-    selected = [stock['ticker'] for stock in high_volume[:count]]
+    selected = []
+    if bars:
+        tickers, close, volume = bars_to_matrix(bars)
+        scores = score_momentum(close, volume, volume_window=10)
+        
+        # 50% above average volume
+        best = top_k_indices(scores['volume_ratio'], count, scores['volume_ratio'] > 1.5)
+        selected = [tickers[i] for i in best]
     
     print(f"📊 Found {len(selected)} high-volume stocks: {selected}")
     return selected
 
 def get_stocks_in_news(count=10):
-    """Get stocks currently in news"""
+    """Get stocks currently in news (raises if every search fails)"""
     print("📰 Scanning for stocks in news...")
     
-    try:
-        newsapi = NewsApiClient(api_key=os.environ.get('NEWS_API_KEY', ''))
-        
-        # Common stock keywords
-        stock_keywords = ["Apple", "Tesla", "Nvidia", "Microsoft", "Amazon", "Google", 
-                         "Meta", "Netflix", "AMD", "Intel", "Qualcomm", "Salesforce"]
-        
-        news_stocks = set()
-        
-        for keyword in stock_keywords:
-            try:
-                articles = newsapi.get_everything(
-                    q=keyword,
-                    language='en',
-                    sort_by='publishedAt',
-                    page_size=3
-                )
-                
-                if articles and articles.get('articles'):
-                    # Map company names to tickers
-                    company_to_ticker = {
-                        "Apple": "AAPL", "Tesla": "TSLA", "Nvidia": "NVDA",
-                        "Microsoft": "MSFT", "Amazon": "AMZN", "Google": "GOOGL",
-                        "Meta": "META", "Netflix": "NFLX", "AMD": "AMD",
-                        "Intel": "INTC", "Qualcomm": "QCOM", "Salesforce": "CRM"
-                    }
-                    
-                    if keyword in company_to_ticker:
-                        news_stocks.add(company_to_ticker[keyword])
-                        
-            except Exception:
-                continue
-        
-        selected = list(news_stocks)[:count]
-        print(f"📰 Found {len(selected)} stocks in news: {selected}")
-        return selected
-        
-    except Exception as e:
-        print(f"❌ News scan failed: {e}")
-        return []
-
-def get_dynamic_watchlist():
-    """Combine all methods to get best trading candidates"""
-    print("🔄 Generating dynamic watchlist...")
+    newsapi = NewsApiClient(api_key=os.environ.get('NEWS_API_KEY', ''))
     
-    # Get stocks from multiple sources
-    momentum_stocks = get_active_stocks(8)
-    volume_stocks = get_high_volume_stocks(6)
-    news_stocks = get_stocks_in_news(6)
+    # Common stock keywords
+    stock_keywords = ["Apple", "Tesla", "Nvidia", "Microsoft", "Amazon", "Google", 
+                     "Meta", "Netflix", "AMD", "Intel", "Qualcomm", "Salesforce"]
     
+    # Map company names to tickers
+    company_to_ticker = {
+        "Apple": "AAPL", "Tesla": "TSLA", "Nvidia": "NVDA",
+        "Microsoft": "MSFT", "Amazon": "AMZN", "Google": "GOOGL",
+        "Meta": "META", "Netflix": "NFLX", "AMD": "AMD",
+        "Intel": "INTC", "Qualcomm": "QCOM", "Salesforce": "CRM"
+    }
+    
+    def search(keyword):
+        return newsapi.get_everything(
+            q=keyword,
+            language='en',
+            sort_by='publishedAt',
+            page_size=3
+        )
+    
+    # Query all keywords in parallel; failed keywords are just skipped
+    responses, errors = fetch_concurrently(search, stock_keywords, provider="newsapi")
+    if not responses and errors:
+        raise RuntimeError(f"All {len(errors)} news searches failed, e.g. {next(iter(errors.values()))}")
+    
+    news_stocks = set()
+    for keyword in stock_keywords:
+        articles = responses.get(keyword)
+        if articles and articles.get('articles') and keyword in company_to_ticker:
+            news_stocks.add(company_to_ticker[keyword])
+    
+    selected = list(news_stocks)[:count]
+    print(f"📰 Found {len(selected)} stocks in news: {selected}")
+    return selected
+
+def momentum_scan(count=8):
+    """Momentum scan: the large universe when a universe file is configured"""
+    universe_file = SCANNER_PARAMS["universe_file"]
+    if universe_file and os.path.exists(universe_file):
+        return scan_universe(universe_file, count)
+    return get_active_stocks(count)
+
+def combine_watchlist(momentum_stocks, volume_stocks, news_stocks):
+    """Merge scanner results, topping up with liquid defaults if too few"""
     # Combine and deduplicate
     all_stocks = list(set(momentum_stocks + volume_stocks + news_stocks))
     
@@ -170,5 +280,25 @@ def get_dynamic_watchlist():
             if stock not in all_stocks and len(all_stocks) < 12:
                 all_stocks.append(stock)
     
+    return all_stocks
+
+def get_dynamic_watchlist():
+    """Combine all methods to get best trading candidates"""
+    print("🔄 Generating dynamic watchlist...")
+    
+    # Run the three scanners in parallel
+    scanners = {momentum_scan: 8, get_high_volume_stocks: 6, get_stocks_in_news: 6}
+    found, _ = fetch_concurrently(
+        lambda scan: scan(scanners[scan]),
+        list(scanners),
+        max_workers=len(scanners),
+        timeout=FETCH_PARAMS["scan_timeout_seconds"]
+    )
+    all_stocks = combine_watchlist(
+        found.get(momentum_scan, []),
+        found.get(get_high_volume_stocks, []),
+        found.get(get_stocks_in_news, [])
+    )
+    
     print(f"🎯 Final dynamic watchlist ({len(all_stocks)} stocks): {all_stocks}")
-    return all_stocks
\ No newline at end of file
+    return all_stocks
@@ -0,0 +1,141 @@
+# order_router.py
+import time
+import uuid
+import threading
+from collections import deque
+
+import numpy as np
+
+import tools
+from broker_state import position_book
+from fill_tracker import fill_tracker
+from fetch_engine import fetch_concurrently
+from trading_config import ORDER_PARAMS
+
+# Recent submit-to-ack latencies (ms)
+_latencies = deque(maxlen=ORDER_PARAMS["latency_history"])
+_latencies_lock = threading.Lock()
+
+def new_client_order_id(prefix="hft"):
+    """Unique client-side order ID, known before the broker acks"""
+    return f"{prefix}-{uuid.uuid4().hex[:24]}"
+
+def lookup_order(client_order_id):
+    """The broker's order for a client_order_id, or None if it has none (yet)"""
+    try:
+        return tools.get_client().get_order_by_client_id(client_order_id)
+    except Exception:
+        return None
+
+def _resolve_timeouts(client_order_ids, max_workers=None):
+    """Find out which timed-out submissions reached the broker.
+
+    All IDs are looked up in parallel and the ones still unknown are retried
+    together, so the whole batch shares one deadline of timeout_lookups
+    intervals. Returns {client_order_id: order} for those the broker has.
+    """
+    interval = ORDER_PARAMS["timeout_lookup_interval_seconds"]
+    deadline = time.monotonic() + ORDER_PARAMS["timeout_lookups"] * interval
+    found = {}
+    unresolved = list(client_order_ids)
+    while unresolved:
+        orders, _ = fetch_concurrently(
+            lookup_order,
+            unresolved,
+            max_workers=max_workers or ORDER_PARAMS["max_parallel_orders"],
+            timeout=max(0.1, deadline - time.monotonic())
+        )
+        found.update({client_order_id: order for client_order_id, order in orders.items() if order is not None})
+        unresolved = [client_order_id for client_order_id in unresolved if client_order_id not in found]
+        if not unresolved or time.monotonic() + interval > deadline:
+            break
+        time.sleep(interval)
+    return found
+
+def _submit_one(order):
+    fill_tracker.expect(order['client_order_id'])
+    start = time.perf_counter()
+    ack = tools.submit_market_order(
+        order['ticker'], order['qty'], order['side'], client_order_id=order['client_order_id']
+    )
+    latency_ms = (time.perf_counter() - start) * 1000
+    with _latencies_lock:
+        _latencies.append(latency_ms)
+    return ack, latency_ms
+
+def submit_orders(orders, max_workers=None):
+    """Submit a batch of market orders concurrently.
+    
+    Each order is a dict with ticker, qty and side. Every order gets a
+    client_order_id and its submit-to-ack latency is recorded. Returns one
+    result dict per order, in the same order as given.
+    
+    Submissions that time out are looked up together by client_order_id: if
+    the broker has one, it counts as submitted. If it still can't be found the
+    result is not submitted but 'pending', since the order may yet arrive.
+    """
+    orders = [dict(order, client_order_id=order.get('client_order_id') or new_client_order_id())
+              for order in orders]
+    by_id = {order['client_order_id']: order for order in orders}
+    
+    start = time.perf_counter()
+    acks, errors = fetch_concurrently(
+        lambda client_order_id: _submit_one(by_id[client_order_id]),
+        list(by_id),
+        max_workers=max_workers or ORDER_PARAMS["max_parallel_orders"],
+        timeout=ORDER_PARAMS["submit_timeout_seconds"]
+    )
+    
+    timed_out = [client_order_id for client_order_id, error in errors.items() if isinstance(error, TimeoutError)]
+    if timed_out:
+        # The orders may still have reached the broker
+        position_book.mark_stale()
+        resolved = _resolve_timeouts(timed_out, max_workers=max_workers)
+        resolved_ms = (time.perf_counter() - start) * 1000
+        for client_order_id, ack in resolved.items():
+            order = by_id[client_order_id]
+            print(f"⚠️ {order['side'].upper()} {order['ticker']} timed out but reached the broker ({client_order_id})")
+            acks[client_order_id] = (ack, resolved_ms)
+    
+    results = []
+    for order in orders:
+        client_order_id = order['client_order_id']
+        result = {
+            'ticker': order['ticker'],
+            'side': order['side'],
+            'qty': order['qty'],
+            'client_order_id': client_order_id,
+        }
+        error = errors.get(client_order_id)
+        if client_order_id in acks:
+            ack, latency_ms = acks[client_order_id]
+            result.update({
+                'submitted': True,
+                'order_id': str(ack.id),
+                'latency_ms': latency_ms,
+                'result': f"✅ {order['side'].upper()} order executed: {order['qty']} shares of {order['ticker']}. Order ID: {ack.id}",
+            })
+        else:
+            result.update({
+                'submitted': False,
+                'pending': isinstance(error, TimeoutError),
+                'error': str(error),
+                'result': f"❌ Order failed: {error}",
+            })
+        results.append(result)
+    
+    return results
+
+def get_order_latency_stats():
+    """Submit-to-ack latency summary over recent orders"""
+    with _latencies_lock:
+        latencies = np.array(_latencies)
+    if not len(latencies):
+        return {"orders": 0}
+    return {
+        "orders": len(latencies),
+        "mean_ms": float(latencies.mean()),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "max_ms": float(latencies.max()),
+    }
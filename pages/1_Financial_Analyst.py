@@ -1,12 +1,21 @@
 # pages/1_Financial_Analyst.py
 import streamlit as st
-import yfinance as yf
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
 
+from market_data import get_provider
+from indicators import indicator_frame
+from trading_config import TECHNICAL_PARAMS, ANALYSIS_CACHE_PARAMS
+
 st.set_page_config(page_title="Financial Analyst", layout="wide")
 
+# Indicator column names follow the configured periods
+SMA_SHORT = TECHNICAL_PARAMS["sma_short"]
+SMA_LONG = TECHNICAL_PARAMS["sma_long"]
+SMA_SHORT_COL = f"SMA_{SMA_SHORT}"
+SMA_LONG_COL = f"SMA_{SMA_LONG}"
+
 st.title("📈 Financial Analyst")
 st.markdown("Quick stock analysis with essential metrics and technical indicators")
 
@@ -27,23 +36,37 @@ with col1:
 with col2:
     period = st.selectbox("Period:", ["1mo", "3mo", "6mo", "1y"], index=1)
 
+# Cached data loaders - st.cache_data is shared across all browser sessions
+@st.cache_data(ttl=ANALYSIS_CACHE_PARAMS["price_ttl_seconds"], show_spinner=False)
+def load_price_history(ticker, period):
+    """Daily bars with SMA/RSI columns, cached per (ticker, period)"""
+    hist = get_provider().get_bars(ticker, period=period, interval="1d")
+    if hist.empty:
+        return hist
+    
+    # Calculate basic indicators
+    indicators = indicator_frame(hist)
+    hist[SMA_SHORT_COL] = indicators['SMA_short']
+    hist[SMA_LONG_COL] = indicators['SMA_long']
+    hist['RSI'] = indicators['RSI']
+    return hist
+
+@st.cache_data(ttl=ANALYSIS_CACHE_PARAMS["fundamentals_ttl_seconds"], show_spinner=False)
+def load_fundamentals(ticker):
+    """Company info, cached longer than prices since it rarely changes"""
+    return get_provider().get_fundamentals(ticker)
+
 # Main analysis function
 def quick_analysis(ticker, period):
     """Quick but comprehensive stock analysis"""
     try:
-        stock = yf.Ticker(ticker)
-        hist = stock.history(period=period)
+        hist = load_price_history(ticker, period)
         
         if hist.empty:
             return None, "No data found"
         
-        # Calculate basic indicators
-        hist['SMA_20'] = hist['Close'].rolling(20).mean()
-        hist['SMA_50'] = hist['Close'].rolling(50).mean()
-        hist['RSI'] = calculate_rsi(hist['Close'])
-        
         # Get key info
-        info = stock.info
+        info = load_fundamentals(ticker)
         current_price = hist['Close'].iloc[-1]
         prev_price = hist['Close'].iloc[-2] if len(hist) > 1 else current_price
         change = current_price - prev_price
@@ -65,14 +88,6 @@ def quick_analysis(ticker, period):
     except Exception as e:
         return None, f"Error: {str(e)}"
 
-def calculate_rsi(prices, window=14):
-    """Calculate RSI indicator"""
-    delta = prices.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-    rs = gain / loss
-    return 100 - (100 / (1 + rs))
-
 # Run analysis
 if st.button("🔍 Analyze Stock", type="primary", use_container_width=True):
     with st.spinner(f"Analyzing {st.session_state.analysis_ticker}..."):
@@ -131,16 +146,16 @@ if st.session_state.analysis_data:
     # Moving averages
     fig.add_trace(go.Scatter(
         x=data['historical'].index,
-        y=data['historical']['SMA_20'],
+        y=data['historical'][SMA_SHORT_COL],
         line=dict(color='orange', width=1),
-        name='SMA 20'
+        name=f'SMA {SMA_SHORT}'
     ))
     
     fig.add_trace(go.Scatter(
         x=data['historical'].index,
-        y=data['historical']['SMA_50'],
+        y=data['historical'][SMA_LONG_COL],
         line=dict(color='blue', width=1),
-        name='SMA 50'
+        name=f'SMA {SMA_LONG}'
     ))
     
     fig.update_layout(
@@ -159,24 +174,24 @@ if st.session_state.analysis_data:
     with col5:
         # RSI analysis
         rsi = data['rsi']
-        if rsi > 70:
-            st.error("RSI: Overbought (>70)")
-        elif rsi < 30:
-            st.success("RSI: Oversold (<30)")
+        if rsi > TECHNICAL_PARAMS["rsi_overbought"]:
+            st.error(f"RSI: Overbought (>{TECHNICAL_PARAMS['rsi_overbought']})")
+        elif rsi < TECHNICAL_PARAMS["rsi_oversold"]:
+            st.success(f"RSI: Oversold (<{TECHNICAL_PARAMS['rsi_oversold']})")
         else:
             st.info(f"RSI: Neutral ({rsi:.1f})")
         
         # Moving average analysis
         current_price = data['current_price']
-        sma_20 = data['historical']['SMA_20'].iloc[-1]
-        if current_price > sma_20:
-            st.success("Price above 20-day MA")
+        sma_short = data['historical'][SMA_SHORT_COL].iloc[-1]
+        if current_price > sma_short:
+            st.success(f"Price above {SMA_SHORT}-day MA")
         else:
-            st.warning("Price below 20-day MA")
+            st.warning(f"Price below {SMA_SHORT}-day MA")
     
     with col6:
         # Volume analysis
-        avg_volume = data['historical']['Volume'].tail(20).mean()
+        avg_volume = data['historical']['Volume'].tail(TECHNICAL_PARAMS['volume_window']).mean()
         current_volume = data['volume']
         volume_ratio = current_volume / avg_volume if avg_volume > 0 else 1
         
@@ -194,12 +209,12 @@ if st.session_state.analysis_data:
     
     insights = []
     rsi = data['rsi']
-    price_vs_ma = data['current_price'] > data['historical']['SMA_20'].iloc[-1]
+    price_vs_ma = data['current_price'] > data['historical'][SMA_SHORT_COL].iloc[-1]
     
-    if rsi < 30 and price_vs_ma:
-        insights.append("Oversold but above 20-day MA - potential buying opportunity")
-    elif rsi > 70 and not price_vs_ma:
-        insights.append("Overbought and below 20-day MA - caution advised")
+    if rsi < TECHNICAL_PARAMS["rsi_oversold"] and price_vs_ma:
+        insights.append(f"Oversold but above {SMA_SHORT}-day MA - potential buying opportunity")
+    elif rsi > TECHNICAL_PARAMS["rsi_overbought"] and not price_vs_ma:
+        insights.append(f"Overbought and below {SMA_SHORT}-day MA - caution advised")
     elif data['change_pct'] > 3:
         insights.append("Strong upward momentum today")
     elif data['change_pct'] < -3:
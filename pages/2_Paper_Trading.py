@@ -1,6 +1,8 @@
 # pages/2_Paper_Trading.py
 import streamlit as st
-from agent_logic import run_paper_trading_agent_cycle, get_current_portfolio_summary
+from agent_logic import run_paper_trading_agent_cycle, run_watchlist_cycles, get_current_portfolio_summary
+from batch_decisions import decide_batch, execute_decisions
+from trading_config import DEFAULT_WATCHLIST, AGENT_PARAMS
 import pandas as pd
 
 st.set_page_config(layout="wide")
@@ -18,13 +20,29 @@ if 'trading_ticker' not in st.session_state:
 
 # Controls
 st.session_state.trading_ticker = st.text_input("Stock Ticker:", value=st.session_state.trading_ticker).upper()
+prefetch = st.checkbox("⚡ Pre-fetch price, news and holdings (fewer agent steps)", value=AGENT_PARAMS["prefetch_context"])
 
 if st.button("▶️ Run One Trading Cycle", use_container_width=True):
     with st.spinner(f"Agent is analyzing {st.session_state.trading_ticker}..."):
-        log_output = run_paper_trading_agent_cycle(st.session_state.trading_ticker)
+        log_output = run_paper_trading_agent_cycle(st.session_state.trading_ticker, prefetch=prefetch)
         st.session_state.trading_logs.insert(0, log_output)
         st.rerun()
 
+if st.button(f"⏩ Run Cycle for Watchlist ({len(DEFAULT_WATCHLIST)} stocks)", use_container_width=True):
+    with st.spinner(f"Agent is analyzing {', '.join(DEFAULT_WATCHLIST)} in parallel..."):
+        outputs = run_watchlist_cycles(DEFAULT_WATCHLIST, prefetch=prefetch)
+        for ticker, log_output in outputs.items():
+            st.session_state.trading_logs.insert(0, f"[{ticker}] {log_output}")
+        st.rerun()
+
+if st.button("🧮 Batch Decide Watchlist (one LLM call)", use_container_width=True):
+    with st.spinner(f"Deciding on {len(DEFAULT_WATCHLIST)} stocks in one batch..."):
+        decisions = decide_batch(DEFAULT_WATCHLIST)
+        executed = execute_decisions(decisions)
+        summary = "\n".join(f"{d['ticker']}: {d['action']} ({d['confidence']}) - {d['reason']}" for d in decisions)
+        st.session_state.trading_logs.insert(0, f"[BATCH] {len(executed)} orders placed\n{summary}")
+        st.rerun()
+
 st.markdown("---")
 
 # Portfolio Display
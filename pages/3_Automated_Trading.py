@@ -1,11 +1,14 @@
 # pages/3_Automated_Trading.py
+import os
 import streamlit as st
 import pandas as pd
 import time
 from datetime import datetime
 
 # HFT IMPORTS - REPLACED OLD IMPORTS
-from automated_agent import run_hft_scalping_cycle, get_hft_stats
+from automated_agent import get_hft_stats
+from tools import reconcile_positions
+from trading_engine import engine, get_engine_state, control_engine
 
 
 st.set_page_config(layout="wide")
@@ -14,11 +17,10 @@ st.title("🚀 HFT Scalping Trading Bot")
 st.markdown("**High-Frequency Trading Bot - 10% Positions, 0.4% Profit Targets, 2-Minute Max Hold**")
 st.warning("⚠️ **HFT BOT ACTIVE** - Aggressive scalping with large position sizes", icon="⚡")
 
-# Initialize session state
-if 'auto_cycles' not in st.session_state:
-    st.session_state.auto_cycles = []
-if 'is_auto_running' not in st.session_state:
-    st.session_state.is_auto_running = False
+# Cycles run in the background engine; this page only reads its state
+engine_state = get_engine_state()
+auto_cycles = engine_state.get("cycles", [])
+is_auto_running = engine_state.get("status") == "running"
 
 st.markdown("---")
 
@@ -28,33 +30,44 @@ col1, col2, col3 = st.columns(3)
 with col1:
     st.subheader("🔄 HFT Controls")
     
-    if not st.session_state.is_auto_running:
+    if is_auto_running and engine_state.get("pid") != os.getpid():
+        st.caption(f"Engine runs in process {engine_state['pid']}; controls are sent to it")
+    elif engine_state.get("status") == "unresponsive":
+        st.warning(f"Engine in process {engine_state.get('pid')} stopped responding", icon="⚠️")
+    
+    if not is_auto_running:
         if st.button("▶️ Start HFT Bot", type="primary", use_container_width=True):
-            st.session_state.is_auto_running = True
-            st.rerun()
+            if engine.start():
+                st.rerun()
+            st.warning("The engine is still finishing its last cycle or runs in another process - try again shortly", icon="⏳")
         
         if st.button("🔍 Run Single HFT Cycle", use_container_width=True):
-            with st.spinner("🚀 HFT Bot scanning for momentum opportunities..."):
-                result = run_hft_scalping_cycle()
-                st.session_state.auto_cycles.insert(0, result)
-                if "error" not in result:
-                    st.success(f"✅ HFT Cycle Complete! {result['trades_executed']} trades executed")
-                else:
-                    st.error(f"❌ HFT Cycle Failed: {result['error']}")
+            control_engine("trigger")
+            st.info("🚀 HFT cycle started in the background - refresh to see results")
     else:
         if st.button("⏹️ Stop HFT Bot", type="secondary", use_container_width=True):
-            st.session_state.is_auto_running = False
+            control_engine("stop")
             st.rerun()
 
 with col2:
     st.subheader("📊 Live HFT Stats")
-    stats = get_hft_stats()
+    stats = engine_state.get("stats") or get_hft_stats()
     
     if "error" not in stats:
         st.metric("Portfolio Value", f"${stats['portfolio_value']:,.2f}")
         st.metric("Active Positions", f"{stats['active_positions']}/{stats['max_positions']}")
         st.metric("Daily Trades", f"{stats['daily_trades']}/30")
         st.metric("Buying Power", f"${stats['buying_power']:,.2f}")
+        latency = stats.get("order_latency", {})
+        if latency.get("orders"):
+            st.metric("Order Ack Latency (p50)", f"{latency['p50_ms']:.0f} ms")
+        fill_latency = stats.get("fill_latency", {})
+        if fill_latency.get("fills"):
+            st.metric("Fill Latency (p50)", f"{fill_latency['p50_ms']:.0f} ms")
+        exit_latency = stats.get("exit_latency", {})
+        if exit_latency.get("exits"):
+            st.metric("Monitor Exit Latency (p50)", f"{exit_latency['p50_ms']:.0f} ms")
+        st.metric("Realized P&L Today", f"${stats.get('realized_pnl', 0.0):,.2f}")
     else:
         st.error(stats["error"])
 
@@ -88,24 +101,21 @@ with strategy_col2:
     st.write("• Portfolio rotation")
 
 # Auto-trading simulation
-if st.session_state.is_auto_running:
-    st.info("🔵 **HFT BOT ACTIVE** - Running continuous scalping cycles every 3 minutes")
+if is_auto_running:
+    st.info(f"🔵 **HFT BOT ACTIVE** - Running continuous scalping cycles every {engine_state['interval_seconds'] // 60:g} minutes")
+    if engine_state.get("next_cycle_at"):
+        st.caption(f"⏱️ Next cycle in {max(0, engine_state['next_cycle_at'] - time.time()):.0f}s")
     
     if st.button("🔄 Run Next HFT Cycle Now"):
-        with st.spinner("🚀 HFT Bot executing rapid scalping strategy..."):
-            result = run_hft_scalping_cycle()
-            st.session_state.auto_cycles.insert(0, result)
-            if "error" not in result:
-                st.success(f"✅ HFT Cycle Complete! {result['trades_executed']} trades, P&L: {result.get('total_pnl', 0):.2f}%")
-            else:
-                st.error(f"❌ HFT Cycle Failed: {result['error']}")
+        control_engine("trigger")
+        st.info("🚀 HFT cycle started in the background - refresh to see results")
 
 # Results Display - ENHANCED FOR HFT
 st.markdown("---")
 st.subheader("📋 HFT Trading Activity")
 
-if st.session_state.auto_cycles:
-    latest_cycle = st.session_state.auto_cycles[0]
+if auto_cycles:
+    latest_cycle = auto_cycles[0]
     
     if "error" in latest_cycle:
         st.error(f"HFT Cycle Error: {latest_cycle['error']}")
@@ -196,12 +206,12 @@ if st.session_state.auto_cycles:
             st.info("No trades executed in this cycle. The bot may be waiting for better entry signals.")
 
 else:
-    st.info("🚀 No HFT cycles run yet. Click 'Run Single HFT Cycle' to start scalping!")
+    st.info("🚀 No HFT cycles run yet. Click 'Start HFT Bot' or 'Run Single HFT Cycle' to start scalping!")
 
 # Trading History
-if len(st.session_state.auto_cycles) > 1:
+if len(auto_cycles) > 1:
     with st.expander("📜 HFT Cycle History"):
-        for i, cycle in enumerate(st.session_state.auto_cycles[1:6]):  # Show last 5
+        for i, cycle in enumerate(auto_cycles[1:6]):  # Show last 5
             if "error" not in cycle:
                 st.write(f"**Cycle {i+1}:** {cycle['timestamp'][11:19]} - {cycle['trades_executed']} trades, P&L: {cycle.get('total_pnl', 0):.2f}%")
 
@@ -209,12 +219,12 @@ if len(st.session_state.auto_cycles) > 1:
 st.markdown("---")
 st.subheader("📈 HFT Performance Analytics")
 
-if st.session_state.auto_cycles:
+if auto_cycles:
     # Calculate overall performance
-    total_cycles = len(st.session_state.auto_cycles)
-    total_trades = sum(cycle.get('trades_executed', 0) for cycle in st.session_state.auto_cycles if "error" not in cycle)
-    total_buys = sum(cycle.get('buy_trades', 0) for cycle in st.session_state.auto_cycles if "error" not in cycle)
-    total_sells = sum(cycle.get('sell_trades', 0) for cycle in st.session_state.auto_cycles if "error" not in cycle)
+    total_cycles = len(auto_cycles)
+    total_trades = sum(cycle.get('trades_executed', 0) for cycle in auto_cycles if "error" not in cycle)
+    total_buys = sum(cycle.get('buy_trades', 0) for cycle in auto_cycles if "error" not in cycle)
+    total_sells = sum(cycle.get('sell_trades', 0) for cycle in auto_cycles if "error" not in cycle)
     
     perf_col1, perf_col2, perf_col3, perf_col4 = st.columns(4)
     perf_col1.metric("Total Cycles", total_cycles)
@@ -225,7 +235,7 @@ if st.session_state.auto_cycles:
     # Activity chart data
     if total_cycles > 1:
         cycle_data = []
-        for i, cycle in enumerate(st.session_state.auto_cycles[:10]):  # Last 10 cycles
+        for i, cycle in enumerate(auto_cycles[:10]):  # Last 10 cycles
             if "error" not in cycle:
                 cycle_data.append({
                     'Cycle': f"Cycle {i+1}",
@@ -245,11 +255,12 @@ control_col1, control_col2 = st.columns(2)
 
 with control_col1:
     if st.button("🧹 Clear All History", type="secondary", use_container_width=True):
-        st.session_state.auto_cycles = []
+        control_engine("clear_history")
         st.rerun()
 
 with control_col2:
     if st.button("🔄 Refresh Portfolio Data", type="secondary", use_container_width=True):
+        reconcile_positions()
         st.rerun()
 
 # Real-time Status
@@ -259,7 +270,7 @@ st.subheader("🔄 Real-time HFT Status")
 status_col1, status_col2, status_col3, status_col4 = st.columns(4)
 
 with status_col1:
-    st.write("**Trading Engine:** 🟢 Running")
+    st.write(f"**Trading Engine:** {'🟢 Running' if is_auto_running else '⏸️ Stopped'}")
     st.write("**Momentum Scanner:** 🟢 Active")
 
 with status_col2:
@@ -267,13 +278,15 @@ with status_col2:
     st.write("**Order Execution:** 🟢 Ready")
 
 with status_col3:
-    if st.session_state.auto_cycles:
-        last_cycle = st.session_state.auto_cycles[0]
+    if auto_cycles:
+        last_cycle = auto_cycles[0]
         st.write(f"**Last Cycle:** {last_cycle['timestamp'][11:19]}")
-        st.write(f"**Active Cycles:** {len(st.session_state.auto_cycles)}")
+        st.write(f"**Active Cycles:** {len(auto_cycles)}")
+        if engine_state.get("last_cycle_ms"):
+            st.write(f"**Cycle Time:** {engine_state['last_cycle_ms'] / 1000:.1f}s")
 
 with status_col4:
-    if st.session_state.is_auto_running:
+    if is_auto_running:
         st.write("**Bot Status:** 🟢 ACTIVE")
         st.write("**Mode:** Continuous HFT")
     else:
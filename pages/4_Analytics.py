@@ -9,6 +9,8 @@ from datetime import datetime, timedelta
 import json
 import os
 from analytics_logger import get_analytics_data
+from llm_metrics import llm_metrics
+from summary_cache import news_summary_cache
 
 st.set_page_config(page_title="Trading Analytics", layout="wide")
 
@@ -194,6 +196,69 @@ with behavior_col2:
     else:
         st.info("No trade data available yet")
 
+# LLM Performance
+st.markdown("---")
+st.subheader("🧠 LLM Performance")
+st.caption("Retries are counted for batch decisions and news summaries; the ReAct agent's model retries inside its client and those retries are not tracked.")
+
+llm_records = [d for d in analytics_data['decisions'] if d.get('llm')]
+if llm_records:
+    llm_df = pd.DataFrame([{'ticker': d['ticker'], 'mode': d.get('mode', 'agent'), **d['llm']} for d in llm_records])
+    
+    llm_col1, llm_col2, llm_col3, llm_col4 = st.columns(4)
+    llm_col1.metric("Avg Model Time / Decision", f"{llm_df['llm_ms'].mean() / 1000:.1f}s")
+    llm_col2.metric("Avg Tool Time / Decision", f"{llm_df['tool_ms'].mean() / 1000:.1f}s")
+    llm_col3.metric("Avg Tokens / Decision", f"{(llm_df['prompt_tokens'] + llm_df['completion_tokens']).mean():,.0f}")
+    llm_col4.metric("Est. Cost / Decision", f"${llm_df['cost_usd'].mean():.4f}")
+    
+    by_ticker = llm_df.groupby('ticker')[['llm_ms', 'tool_ms', 'prompt_tokens', 'completion_tokens', 'llm_calls', 'tool_calls', 'retries', 'cost_usd']].mean().round(2)
+    st.dataframe(by_ticker, use_container_width=True)
+    
+    fig = px.histogram(llm_df, x='llm_ms', color='mode', nbins=30,
+                       title="Model Time per Decision (ms)")
+    st.plotly_chart(fig, use_container_width=True)
+else:
+    st.info("No LLM metrics recorded yet")
+
+# Step latencies and token totals from this app session's LLM calls
+st.write("**⏱️ LLM Step Latency (this session)**")
+st.caption("Batched decision calls cover several tickers at once, so their latencies are grouped under \"batch\"; their tokens are split across the tickers below.")
+step_col1, step_col2 = st.columns(2)
+group_by = step_col1.radio("Group by", ["ticker", "cycle"], horizontal=True)
+step_kind = step_col2.radio("Step", ["llm", "news_summary", "tool"], horizontal=True)
+
+histograms = llm_metrics.histograms(by=group_by, kind=step_kind)
+if histograms:
+    latency_df = pd.DataFrame([{
+        group_by: str(group),
+        'steps': sum(h['counts']),
+        'p50_ms': round(h['p50_ms'], 1),
+        'p95_ms': round(h['p95_ms'], 1),
+    } for group, h in histograms.items()]).set_index(group_by)
+    st.dataframe(latency_df, use_container_width=True)
+    
+    bins = next(iter(histograms.values()))['bins_ms']
+    bin_labels = [f"{low}-{high}" for low, high in zip(bins, bins[1:])] + [f"{bins[-1]}+"]
+    counts_df = pd.DataFrame(
+        {str(group): h['counts'] for group, h in histograms.items()}, index=bin_labels
+    )
+    st.bar_chart(counts_df)
+else:
+    st.info(f"No {step_kind} steps recorded in this session yet")
+
+summary_stats = news_summary_cache.stats()
+st.write("**📰 News Summary Cache (this session)**")
+cache_col1, cache_col2, cache_col3, cache_col4 = st.columns(4)
+cache_col1.metric("Hit Rate", f"{summary_stats['hit_rate']:.0%}")
+cache_col2.metric("Hits", summary_stats['hits'], help=f"{summary_stats['disk_hits']} served from disk")
+cache_col3.metric("Misses", summary_stats['misses'])
+cache_col4.metric("Entries in Memory", summary_stats['entries'])
+
+token_totals = llm_metrics.token_totals()
+if token_totals:
+    st.write("**🪙 Tokens by Ticker (this session)**")
+    st.dataframe(pd.DataFrame.from_dict(token_totals, orient='index'), use_container_width=True)
+
 # Data Management
 st.markdown("---")
 st.subheader("📁 Data Management")
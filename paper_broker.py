@@ -0,0 +1,146 @@
+# paper_broker.py
+import time
+import uuid
+import threading
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from market_data import get_provider
+from fetch_engine import rate_limited
+from fill_tracker import fill_tracker, LocalTradeUpdatePublisher
+from trading_config import BROKER_PARAMS
+
+class SimulatedBroker:
+    """Offline stand-in for Alpaca's TradingClient.
+
+    Implements the methods this project uses (submit_order,
+    get_order_by_client_id, get_all_positions, get_account). Market orders fill immediately against
+    the current market data provider - normally the replay feed - after a
+    configurable ack latency and with configurable slippage. Cash and
+    positions live in memory. Fills are published as trade update events
+    when a publisher is set.
+    """
+
+    def __init__(self, starting_cash=100000.0, latency_ms=0.0, slippage_bps=0.0, price_interval="2m",
+                 publisher=None):
+        self.publisher = publisher
+        self.cash = float(starting_cash)
+        self.latency_ms = latency_ms
+        self.slippage_bps = slippage_bps
+        self.price_interval = price_interval
+        self.orders = []
+        self._positions = {}  # symbol -> {"qty", "avg_entry_price"}
+        self._lock = threading.Lock()
+
+    def _last_price(self, symbol):
+        provider = get_provider()
+        rate_limited(provider.name)
+        hist = provider.get_bars(symbol, period="1d", interval=self.price_interval)
+        if hist is None or hist.empty:
+            raise ValueError(f"No price available for {symbol}")
+        return float(hist['Close'].iloc[-1])
+
+    def submit_order(self, order_data):
+        """Fill a MarketOrderRequest and return an Alpaca-like order object"""
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        symbol = order_data.symbol
+        qty = float(order_data.qty)
+        side = order_data.side.value if hasattr(order_data.side, "value") else str(order_data.side)
+        slip = self.slippage_bps / 10000
+        price = self._last_price(symbol) * (1 + slip if side == "buy" else 1 - slip)
+
+        with self._lock:
+            position = self._positions.get(symbol, {"qty": 0.0, "avg_entry_price": 0.0})
+            if side == "buy":
+                cost = qty * price
+                if cost > self.cash:
+                    raise ValueError(f"insufficient buying power for {qty:g} {symbol}")
+                new_qty = position["qty"] + qty
+                position["avg_entry_price"] = (position["avg_entry_price"] * position["qty"] + cost) / new_qty
+                position["qty"] = new_qty
+                self.cash -= cost
+            else:
+                if qty > position["qty"]:
+                    raise ValueError(f"insufficient qty available for order (requested: {qty:g}, available: {position['qty']:g})")
+                position["qty"] -= qty
+                self.cash += qty * price
+
+            if position["qty"] > 0:
+                self._positions[symbol] = position
+            else:
+                self._positions.pop(symbol, None)
+
+            now = datetime.now(timezone.utc)
+            order = SimpleNamespace(
+                id=str(uuid.uuid4()),
+                client_order_id=order_data.client_order_id or str(uuid.uuid4()),
+                symbol=symbol,
+                qty=qty,
+                side=side,
+                status="filled",
+                filled_qty=qty,
+                filled_avg_price=price,
+                submitted_at=now,
+                filled_at=now,
+            )
+            self.orders.append(order)
+            position_qty = self._positions.get(symbol, {}).get("qty", 0.0)
+
+        if self.publisher:
+            self.publisher.publish(SimpleNamespace(
+                event="fill", order=order, price=price, qty=qty,
+                position_qty=position_qty, timestamp=now,
+            ))
+        return order
+
+    def get_order_by_client_id(self, client_id):
+        with self._lock:
+            for order in reversed(self.orders):
+                if order.client_order_id == client_id:
+                    return order
+        raise ValueError(f"order not found: {client_id}")
+
+    def get_all_positions(self):
+        with self._lock:
+            held = {symbol: dict(p) for symbol, p in self._positions.items()}
+
+        positions = []
+        for symbol, p in held.items():
+            try:
+                current_price = self._last_price(symbol)
+            except Exception:
+                current_price = p["avg_entry_price"]
+            positions.append(SimpleNamespace(
+                symbol=symbol,
+                qty=p["qty"],
+                avg_entry_price=p["avg_entry_price"],
+                current_price=current_price,
+                market_value=p["qty"] * current_price,
+                unrealized_pl=(current_price - p["avg_entry_price"]) * p["qty"],
+            ))
+        return positions
+
+    def get_account(self):
+        market_value = sum(p.market_value for p in self.get_all_positions())
+        with self._lock:
+            cash = self.cash
+        return SimpleNamespace(
+            cash=cash,
+            portfolio_value=cash + market_value,
+            equity=cash + market_value,
+            buying_power=cash,
+        )
+
+def create_simulated_broker(**overrides):
+    """SimulatedBroker configured from BROKER_PARAMS, with fills fed to the fill tracker"""
+    params = {
+        "starting_cash": BROKER_PARAMS["sim_starting_cash"],
+        "latency_ms": BROKER_PARAMS["sim_latency_ms"],
+        "slippage_bps": BROKER_PARAMS["sim_slippage_bps"],
+    }
+    params.update(overrides)
+    publisher = LocalTradeUpdatePublisher()
+    fill_tracker.attach(publisher)
+    return SimulatedBroker(publisher=publisher, **params)
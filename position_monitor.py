@@ -0,0 +1,117 @@
+# position_monitor.py
+import time
+import threading
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+
+import automated_agent
+from market_data import fetch_bars_batch
+from trading_config import MONITOR_PARAMS
+
+class PositionMonitor:
+    """Watches held tickers between cycles and exits as soon as a rule fires.
+
+    Every check_interval_seconds it pulls the latest bars for the held
+    tickers only, applies the stop-loss/profit-target/max-hold rules from
+    automated_agent.evaluate_exit and submits sells straight away. Records
+    rule-to-ack latency (rule fired -> broker acked the sell).
+    """
+
+    def __init__(self, check_interval_seconds, price_interval="1m", latency_history=1000):
+        self.check_interval_seconds = check_interval_seconds
+        self.price_interval = price_interval
+        self.checks = 0
+        self.exits = 0
+        self._latencies = deque(maxlen=latency_history)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_running():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="position-monitor", daemon=True)
+        self._thread.start()
+        print(f"✅ Position monitor started (every {self.check_interval_seconds}s)")
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        next_check = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self.check_once()
+            except Exception as e:
+                print(f"❌ Position monitor error: {e}")
+            next_check = max(next_check + self.check_interval_seconds, time.monotonic())
+            self._stop.wait(next_check - time.monotonic())
+
+    def check_once(self):
+        """Evaluate exit rules on the latest prices and submit any exits"""
+        # Fills and submissions change the book from other threads
+        with automated_agent._book_lock:
+            held = {ticker: dict(position) for ticker, position in automated_agent.active_positions.items()}
+        self.checks += 1
+        if not held:
+            return []
+
+        bars = fetch_bars_batch(list(held), period="1d", interval=self.price_interval, use_cache=False)
+        now = datetime.now()
+
+        exits = []
+        for ticker, position in held.items():
+            hist = bars.get(ticker)
+            if hist is None or hist.empty or position.get('exiting'):
+                continue
+            exit_trade = automated_agent.evaluate_exit(ticker, position, float(hist['Close'].iloc[-1]), now)
+            if exit_trade and automated_agent.claim_exit(ticker):
+                exit_trade['fired_at'] = time.perf_counter()
+                exits.append(exit_trade)
+
+        if not exits:
+            return []
+
+        for exit_trade in exits:
+            print(f"🛑 MONITOR EXIT: {exit_trade['ticker']} - {exit_trade['reason']}")
+
+        executions = automated_agent.execute_hft_trades([{
+            'ticker': exit_trade['ticker'],
+            'action': "SELL",
+            'shares': exit_trade['shares'],
+            'price': exit_trade['current_price'],
+            'reason': f"HFT Exit: {exit_trade['reason']}"
+        } for exit_trade in exits])
+        acked_at = time.perf_counter()
+
+        with self._lock:
+            for exit_trade, execution in zip(exits, executions):
+                if execution["executed"]:
+                    self.exits += 1
+                    self._latencies.append((acked_at - exit_trade['fired_at']) * 1000)
+        return list(zip(exits, executions))
+
+    def latency_stats(self):
+        """Rule-to-ack latency summary over recent monitor exits"""
+        with self._lock:
+            latencies = np.array(self._latencies)
+        stats = {"checks": self.checks, "exits": self.exits}
+        if len(latencies):
+            stats.update({
+                "mean_ms": float(latencies.mean()),
+                "p50_ms": float(np.percentile(latencies, 50)),
+                "p95_ms": float(np.percentile(latencies, 95)),
+                "max_ms": float(latencies.max()),
+            })
+        return stats
+
+position_monitor = PositionMonitor(
+    check_interval_seconds=MONITOR_PARAMS["check_interval_seconds"],
+    price_interval=MONITOR_PARAMS["price_interval"],
+)
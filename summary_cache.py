@@ -0,0 +1,166 @@
+# summary_cache.py
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+from trading_config import NEWS_SUMMARY_PARAMS
+
+def summary_key(company, articles, prompt_version):
+    """Content hash of a summarization request: same company, same articles
+    (by URL and title) and same prompt version give the same key"""
+    payload = json.dumps([
+        company.strip().lower(),
+        [[a.get('url') or '', a.get('title') or ''] for a in articles],
+        prompt_version,
+    ])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class SummaryCache:
+    """Content-addressed cache of LLM summaries.
+
+    An in-memory LRU sits in front of one JSON file per key on disk, so
+    summaries survive restarts. Entries expire after ttl_seconds in both.
+    The disk store is pruned on the first write and then every tenth of
+    max_disk_entries writes: expired files are deleted, then the least
+    recently used (by file mtime, touched on every disk hit) beyond
+    max_disk_entries.
+    """
+
+    def __init__(self, cache_dir, max_entries, ttl_seconds, max_disk_entries):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_entries = max_disk_entries
+        self._writes_since_prune = None  # None until the first prune
+        self._prune_lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (created_at, summary)
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _expired(self, created_at):
+        return time.time() - created_at > self.ttl_seconds
+
+    def _remember(self, key, created_at, summary):
+        self._entries[key] = (created_at, summary)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key):
+        """Cached summary, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and not self._expired(entry[0]):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self._entries.pop(key, None)
+
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                stored = json.load(f)
+            if self._expired(stored["created_at"]):
+                os.remove(path)
+            else:
+                os.utime(path)  # Recently used: keep it through pruning
+                with self._lock:
+                    self._remember(key, stored["created_at"], stored["summary"])
+                    self.hits += 1
+                    self.disk_hits += 1
+                return stored["summary"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, summary):
+        created_at = time.time()
+        with self._lock:
+            self._remember(key, created_at, summary)
+        try:
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"created_at": created_at, "summary": summary}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"❌ Summary cache write error: {e}")
+
+        with self._lock:
+            due = (self._writes_since_prune is None
+                   or self._writes_since_prune >= max(1, self.max_disk_entries // 10))
+            self._writes_since_prune = (self._writes_since_prune or 0) + 1
+        if due:
+            self.prune()
+
+    def prune(self):
+        """Delete expired files, then the least recently used beyond
+        max_disk_entries; returns how many were removed"""
+        if not self._prune_lock.acquire(blocking=False):
+            return 0  # Another thread is already pruning
+        try:
+            with self._lock:
+                self._writes_since_prune = 0
+            removed = 0
+            kept = []  # (mtime, path)
+            for root, _, files in os.walk(self.cache_dir):
+                for name in files:
+                    if not name.endswith(".json"):
+                        continue  # e.g. a put()'s in-flight .tmp file
+                    path = os.path.join(root, name)
+                    try:
+                        with open(path) as f:
+                            expired = self._expired(json.load(f)["created_at"])
+                        mtime = os.path.getmtime(path)
+                    except (OSError, ValueError, KeyError):
+                        expired = True
+                    if not expired:
+                        kept.append((mtime, path))
+                    elif self._remove(path):
+                        removed += 1
+
+            kept.sort()
+            for _, path in kept[:max(0, len(kept) - self.max_disk_entries)]:
+                if self._remove(path):
+                    removed += 1
+            return removed
+        finally:
+            self._prune_lock.release()
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+news_summary_cache = SummaryCache(
+    cache_dir=NEWS_SUMMARY_PARAMS["cache_dir"],
+    max_entries=NEWS_SUMMARY_PARAMS["max_entries"],
+    ttl_seconds=NEWS_SUMMARY_PARAMS["ttl_seconds"],
+    max_disk_entries=NEWS_SUMMARY_PARAMS["max_disk_entries"],
+)
@@ -1,25 +1,65 @@
 # tools.py
 import os
-import yfinance as yf
+import threading
 from langchain.tools import tool
+from langchain_core.runnables import RunnableConfig
 from newsapi import NewsApiClient
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import PromptTemplate
 
+from market_data import get_bars, get_provider
+from broker_state import position_book, account_snapshot
+from fill_tracker import fill_tracker
+from broker_client import get_trading_client
+from summary_cache import news_summary_cache, summary_key
+from llm_metrics import llm_metrics, LLMMetricsHandler, with_counted_retries
+from trading_config import NEWS_SUMMARY_PARAMS
+
 # Alpaca imports
 from alpaca.trading.requests import MarketOrderRequest
 from alpaca.trading.enums import OrderSide, TimeInForce
 
-# Global clients
+# Global clients (trading_client overrides the shared broker client, e.g. in benchmarks)
 trading_client = None
 market_data_client = None
 
+def get_client():
+    """The broker client tools trade through"""
+    return trading_client or get_trading_client()
+
+# News summarization: clients are created once and reused across calls.
+# Bump NEWS_SUMMARY_PROMPT_VERSION whenever the prompt changes so cached
+# summaries from the old prompt are not served.
+NEWS_SUMMARY_PROMPT_VERSION = "1"
+NEWS_SUMMARY_PROMPT = PromptTemplate(
+    template="""Summarize these news articles about {company_name} and provide:
+            1. Overall sentiment (Positive/Neutral/Negative)
+            2. Key themes or topics
+            3. Potential market impact
+            
+            Articles:
+            {articles}
+            
+            Keep the summary concise and focused on trading implications.""",
+    input_variables=["company_name", "articles"]
+)
+_news_clients = {}
+_news_clients_lock = threading.Lock()
+
+def _get_news_clients():
+    """Shared (NewsApiClient, summary chain), built on first use"""
+    with _news_clients_lock:
+        if not _news_clients:
+            _news_clients["newsapi"] = NewsApiClient(api_key=os.environ.get('NEWS_API_KEY', ''))
+            llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0, max_retries=0)
+            _news_clients["chain"] = with_counted_retries(NEWS_SUMMARY_PROMPT | llm, NEWS_SUMMARY_PARAMS["llm_max_retries"])
+        return _news_clients["newsapi"], _news_clients["chain"]
+
 @tool
 def get_stock_info(ticker: str) -> dict:
     """Gets key financial information for a given stock ticker."""
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
+        info = get_provider().get_fundamentals(ticker)
         return {
             "ticker": ticker,
             "company_name": info.get("longName", "N/A"),
@@ -34,11 +74,24 @@ def get_stock_info(ticker: str) -> dict:
     except Exception as e:
         return {"error": f"Failed to get stock info: {str(e)}"}
 
-@tool
-def get_financial_news(company_name: str) -> str:
-    """Fetches and summarizes the latest financial news for a company."""
+def _summary_config(company_name, config):
+    """Run config for a news summary: reports to the calling decision's
+    metrics handler when there is one, else to a handler of its own"""
+    config = dict(config or {})
+    callbacks = config.get("callbacks")
+    handlers = getattr(callbacks, "handlers", callbacks) or []
+    own_handler = None
+    if not any(isinstance(h, LLMMetricsHandler) for h in handlers):
+        own_handler = llm_metrics.handler(ticker=company_name, step="news_summary")
+        config["callbacks"] = [own_handler]
+    config["tags"] = list(config.get("tags") or []) + ["step:news_summary"]
+    return config, own_handler
+
+def summarize_company_news(company_name: str, config: RunnableConfig = None) -> str:
+    """News summary for a company (cached by article set); config carries
+    the caller's callbacks so the LLM call is counted in its metrics"""
     try:
-        newsapi = NewsApiClient(api_key=os.environ.get('NEWS_API_KEY', ''))
+        newsapi, chain = _get_news_clients()
         all_articles = newsapi.get_everything(
             q=company_name, 
             language='en', 
@@ -49,102 +102,137 @@ def get_financial_news(company_name: str) -> str:
         if not all_articles or not all_articles.get('articles'):
             return f"No recent news found for {company_name}."
 
+        # Same articles as last time: reuse the summary, no LLM call
+        key = summary_key(company_name, all_articles['articles'], NEWS_SUMMARY_PROMPT_VERSION)
+        cached = news_summary_cache.get(key)
+        if cached is not None:
+            return cached
+
         articles_text = "\n\n".join([
             f"Title: {a['title']}\nContent: {a.get('description','')}" 
             for a in all_articles['articles']
         ])
 
-        llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0)
-        prompt = PromptTemplate(
-            template="""Summarize these news articles about {company_name} and provide:
-            1. Overall sentiment (Positive/Neutral/Negative)
-            2. Key themes or topics
-            3. Potential market impact
-            
-            Articles:
-            {articles}
-            
-            Keep the summary concise and focused on trading implications.""",
-            input_variables=["company_name", "articles"]
-        )
-        
-        chain = prompt | llm
-        summary = chain.invoke({"company_name": company_name, "articles": articles_text})
+        config, own_handler = _summary_config(company_name, config)
+        try:
+            summary = chain.invoke({"company_name": company_name, "articles": articles_text}, config=config)
+        finally:
+            if own_handler:
+                llm_metrics.finish(own_handler)
+        news_summary_cache.put(key, summary.content)
         return summary.content
         
     except Exception as e:
         return f"Error getting news: {str(e)}"
 
+@tool
+def get_financial_news(company_name: str, config: RunnableConfig) -> str:
+    """Fetches and summarizes the latest financial news for a company."""
+    return summarize_company_news(company_name, config)
+
 @tool
 def get_current_price(ticker: str) -> float:
     """Gets the current real-time price of a stock."""
     try:
-        stock = yf.Ticker(ticker)
-        hist = stock.history(period="1d")
+        hist = get_bars(ticker, period="1d", interval="1d")
         return float(hist['Close'].iloc[-1])
     except Exception as e:
         return f"Error getting price: {str(e)}"
 
+def submit_market_order(ticker: str, qty: int, side: str, client_order_id: str = None):
+    """Submits a market order to Alpaca and returns the order object (raises on failure)."""
+    client = get_client()
+    if not client:
+        raise RuntimeError("Alpaca Trading client not initialized.")
+    
+    if side.lower() not in ['buy', 'sell']:
+        raise ValueError("Invalid side. Must be 'buy' or 'sell'.")
+    
+    market_order_data = MarketOrderRequest(
+        symbol=ticker,
+        qty=qty,
+        side=OrderSide.BUY if side.lower() == 'buy' else OrderSide.SELL,
+        time_in_force=TimeInForce.DAY,
+        client_order_id=client_order_id
+    )
+    
+    order = client.submit_order(market_order_data)
+    _record_own_order(order, ticker, qty, side)
+    return order
+
 @tool
 def place_market_order(ticker: str, qty: int, side: str) -> str:
     """Places a market order (buy or sell) via the Alpaca API."""
-    if not trading_client:
+    if not get_client():
         return "Alpaca Trading client not initialized."
     
     if side.lower() not in ['buy', 'sell']:
         return "Invalid side. Must be 'buy' or 'sell'."
     
     try:
-        market_order_data = MarketOrderRequest(
-            symbol=ticker,
-            qty=qty,
-            side=OrderSide.BUY if side.lower() == 'buy' else OrderSide.SELL,
-            time_in_force=TimeInForce.DAY
-        )
-        
-        order = trading_client.submit_order(market_order_data)
+        order = submit_market_order(ticker, qty, side)
         return f"✅ {side.upper()} order executed: {qty} shares of {ticker}. Order ID: {order.id}"
         
     except Exception as e:
         return f"❌ Order failed: {str(e)}"
 
+def _record_own_order(order, ticker, qty, side):
+    """Update the local position book for an order we just placed"""
+    account_snapshot.invalidate()
+    if fill_tracker.active:
+        return  # The fill event will update the book with the real price
+    try:
+        price = getattr(order, "filled_avg_price", None)
+        if price is None:
+            # Not filled yet: estimate at the last price, the next reconcile corrects it
+            price = float(get_bars(ticker, period="1d", interval="1d")['Close'].iloc[-1])
+        position_book.apply_fill(ticker, side, qty, price)
+    except Exception:
+        position_book.mark_stale()
+
 @tool
 def get_asset_holdings(ticker: str) -> str:
     """Checks the Alpaca account for current holdings of a specific stock."""
-    if not trading_client:
+    client = get_client()
+    if not client:
         return "Alpaca Trading client not initialized."
     
     try:
-        positions = trading_client.get_all_positions()
-        for position in positions:
-            if position.symbol == ticker:
-                return f"Holdings: {position.qty} shares (Market Value: ${position.market_value})"
+        position_book.ensure_fresh(client)
+        position = position_book.get(ticker)
+        if position:
+            return f"Holdings: {position['qty']:g} shares (Market Value: ${position['market_value']:.2f})"
         return "No current holdings."
     except Exception as e:
         return f"Error checking holdings: {str(e)}"
 
+def reconcile_positions():
+    """Re-sync the local position book with Alpaca on demand."""
+    client = get_client()
+    if client:
+        account_snapshot.invalidate()
+        position_book.sync(client)
+
 # REMOVE the @tool decorator from this function so it can be called directly
 def get_portfolio_summary() -> dict:
     """Gets complete portfolio summary from Alpaca."""
-    if not trading_client:
+    client = get_client()
+    if not client:
         return {"error": "Alpaca Trading client not initialized."}
     
     try:
-        account = trading_client.get_account()
-        positions = trading_client.get_all_positions()
+        account = account_snapshot.get(client)
+        position_book.ensure_fresh(client)
         
         return {
-            "cash": float(account.cash),
-            "portfolio_value": float(account.portfolio_value),
-            "equity": float(account.equity),
-            "buying_power": float(account.buying_power),
+            **account,
             "positions": [
                 {
-                    "symbol": p.symbol,
-                    "qty": float(p.qty),
-                    "market_value": float(p.market_value),
-                    "current_price": float(p.current_price)
-                } for p in positions
+                    "symbol": p["symbol"],
+                    "qty": p["qty"],
+                    "market_value": p["market_value"],
+                    "current_price": p["current_price"]
+                } for p in position_book.all()
             ]
         }
     except Exception as e:
@@ -27,4 +27,127 @@ TECHNICAL_PARAMS = {
     "rsi_overbought": 70,
     "sma_short": 20,
     "sma_long": 50,
-}
\ No newline at end of file
+    "rsi_period": 14,
+    "volume_window": 20,
+}
+
+# Market data fetching parameters
+MARKET_DATA_PARAMS = {
+    "provider": "yfinance",       # "yfinance" or "replay" (offline recorded bars)
+    "replay_dir": "market_replay",
+    "batch_chunk_size": 50,       # Tickers per bulk download request
+    "bar_store_dir": "market_store",  # On-disk bar history (None disables)
+    "bar_store_periods": ["1d"],  # Periods served from the store with incremental refresh
+    "cache_max_entries": 500,     # Bar series kept in memory (LRU)
+    "cache_default_ttl_seconds": 60,
+    "cache_ttl_seconds": {        # Per-interval freshness
+        "1m": 30,
+        "2m": 60,
+        "5m": 150,
+        "15m": 300,
+        "1h": 900,
+        "1d": 60,                 # Daily bar's close is used as the live price
+    },
+}
+
+# Concurrent per-ticker fetching
+FETCH_PARAMS = {
+    "max_workers": 8,             # Max requests in flight
+    "task_timeout_seconds": 15,   # Give up on a single slow request
+    "scan_timeout_seconds": 60,   # Budget for a whole scanner run
+    "rate_limits": {              # Calls per second per provider
+        "yfinance": 10,
+        "newsapi": 5,
+    },
+}
+
+# Momentum scanner parameters
+SCANNER_PARAMS = {
+    "universe_file": None,        # e.g. "universe.txt" to scan thousands of symbols
+    "universe_chunk_size": 500,   # Symbols per streamed chunk (bounds memory)
+}
+
+# Financial Analyst page caching
+ANALYSIS_CACHE_PARAMS = {
+    "price_ttl_seconds": 300,             # Daily bars + indicators
+    "fundamentals_ttl_seconds": 6 * 3600, # stock.info is slow and rarely changes
+}
+
+# Broker state syncing
+BROKER_PARAMS = {
+    "backend": "alpaca",               # "alpaca" or "simulated" (offline paper broker)
+    "sim_starting_cash": 100000.0,
+    "sim_latency_ms": 20,              # Simulated submit-to-ack latency
+    "sim_slippage_bps": 2,             # Simulated fill slippage
+    "position_reconcile_seconds": 60,  # Re-check the local position book against Alpaca
+    "account_ttl_seconds": 10,         # Account balances cache (invalidated on orders)
+    "http_pool_size": 10,              # Keep-alive connections per shared broker client
+}
+
+# Order routing
+ORDER_PARAMS = {
+    "max_parallel_orders": 6,      # Orders in flight at once
+    "submit_timeout_seconds": 10,  # Give up waiting for a single ack
+    "timeout_lookups": 3,          # Look a timed-out order up by client_order_id this many times
+    "timeout_lookup_interval_seconds": 1.0,
+    "unconfirmed_giveup_seconds": 120,  # Forget a timed-out order the broker still doesn't know
+    "latency_history": 1000,       # Latency samples kept for stats
+    "entry_chunk_size": 10,        # Watchlist tickers evaluated per entry batch
+}
+
+# Background trading engine (cadence comes from TRADING_PARAMS["trade_frequency_mins"])
+ENGINE_PARAMS = {
+    "state_file": "trading_logs/engine_state.json",  # Read by the UI and other processes
+    "history": 50,                     # Recent cycles kept in the state
+    "command_file": "trading_logs/engine_command.json",  # Stop/trigger requests from other processes
+    "heartbeat_seconds": 5,            # How often a running engine proves it is alive
+    "stop_wait_seconds": 10,           # Start waits this long for a stopping cycle to finish
+}
+
+# Continuous exit monitoring of held positions between cycles
+MONITOR_PARAMS = {
+    "enabled": True,                   # Started alongside the trading engine
+    "check_interval_seconds": 2,       # How often held tickers are re-priced
+    "price_interval": "1m",            # Bar interval used for the latest price
+}
+
+# Background watchlist refresh (cycles read the latest list)
+WATCHLIST_PARAMS = {
+    "momentum_refresh_seconds": 60,    # Momentum/volume price scans
+    "news_refresh_minutes": 15,        # NewsAPI scan
+    "max_staleness_seconds": 300,      # Older than this: the cycle scans itself
+    "retry_seconds": 15,               # First retry of a failed scan; doubles per failure
+}
+
+# LLM trading agent
+AGENT_PARAMS = {
+    "max_concurrent_llm_calls": 4,     # Watchlist cycles in flight at once
+    "ticker_timeout_seconds": 90,      # Give up on one ticker's agent run
+    "prefetch_context": False,         # Opt in: fetch price/news/holdings up front (fewer LLM turns)
+    "context_timeout_seconds": 60,     # Pre-fetch budget; covers the LLM news summary
+}
+
+# LLM news summary cache (keyed by company, article set and prompt version)
+NEWS_SUMMARY_PARAMS = {
+    "cache_dir": "news_cache",
+    "max_entries": 500,                # In-memory LRU size
+    "max_disk_entries": 5000,          # Summary files kept on disk (least recently used go first)
+    "ttl_seconds": 24 * 3600,
+    "llm_max_retries": 2,              # Retries of a failed summary request
+}
+
+# Batched multi-ticker LLM decisions (one structured call per chunk)
+BATCH_DECISION_PARAMS = {
+    "max_tickers_per_call": 25,
+    "max_prompt_chars": 12000,         # Split the watchlist above this prompt size
+    "llm_timeout_seconds": 90,         # Per request; a structured 25-ticker call is slow
+    "llm_max_retries": 1,              # Retries of a failed or timed-out request
+}
+
+# LLM call instrumentation
+LLM_METRICS_PARAMS = {
+    "histogram_bins_ms": [0, 250, 500, 1000, 2000, 5000, 10000, 30000],
+    "history": 5000,                   # Step latencies kept for histograms
+    "input_cost_per_mtok": 0.30,       # USD per 1M prompt tokens (gemini-2.5-flash)
+    "output_cost_per_mtok": 2.50,      # USD per 1M completion tokens
+}
@@ -0,0 +1,309 @@
+# trading_engine.py
+"""Headless HFT engine.
+
+Runs run_hft_scalping_cycle on a fixed cadence in a background thread,
+independent of Streamlit reruns. Its state is kept in memory for readers
+in the same process and mirrored to a JSON state file for readers in
+others. A running engine owns the state file: other processes only read
+it and send control commands through a command file. Run it
+standalone with:
+
+    python trading_engine.py
+"""
+import os
+import json
+import time
+import threading
+from collections import deque
+from datetime import datetime
+
+from trading_config import TRADING_PARAMS, ENGINE_PARAMS, MONITOR_PARAMS
+
+class TradingEngine:
+    """Runs HFT cycles every interval_seconds on a daemon thread.
+
+    Cycles are scheduled against a monotonic clock, so a slow cycle does
+    not push back the ones after it; missed slots are skipped rather than
+    run back to back. The UI reads snapshot() and never runs cycles itself.
+    """
+
+    def __init__(self, interval_seconds, state_file, command_file, heartbeat_seconds=5, history=50):
+        self.interval_seconds = interval_seconds
+        self.state_file = state_file
+        self.command_file = command_file
+        self.heartbeat_seconds = heartbeat_seconds
+        self._cycles = deque(maxlen=history)
+        self._state = {
+            "status": "stopped",
+            "pid": os.getpid(),
+            "interval_seconds": interval_seconds,
+            "cycles_run": 0,
+            "last_cycle_at": None,
+            "last_cycle_ms": None,
+            "next_cycle_at": None,
+            "last_error": None,
+            "heartbeat_at": None,
+            "stats": {},
+        }
+        self._lock = threading.Lock()
+        self._cycle_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._control_thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, stop_wait_seconds=None):
+        """Start the cycle loop; returns whether the engine is running here.
+
+        A stopped engine whose last cycle is still finishing is waited on for
+        up to stop_wait_seconds first. Returns False if it is still finishing
+        after that, or if the engine runs in another process.
+        """
+        if self.is_running():
+            if not self._stop.is_set():
+                return True
+            print("⏳ Waiting for the stopping HFT engine to finish its cycle")
+            self._thread.join(stop_wait_seconds or ENGINE_PARAMS["stop_wait_seconds"])
+            if self._thread.is_alive():
+                print("⚠️ HFT engine is still finishing its last cycle; not restarted")
+                return False
+        if self._control_thread is not None:
+            self._control_thread.join(1.0)  # Exits within one 0.5s poll of stop()
+        remote = remote_engine_state(self.state_file, self.heartbeat_seconds)
+        if remote:
+            print(f"⚠️ HFT engine already running in process {remote['pid']}")
+            return False
+        self._stop.clear()
+        self._wake.clear()
+        self._thread = threading.Thread(target=self._loop, name="hft-engine", daemon=True)
+        self._thread.start()
+        self._control_thread = threading.Thread(target=self._control_loop, name="hft-engine-control", daemon=True)
+        self._control_thread.start()
+        if MONITOR_PARAMS["enabled"]:
+            from position_monitor import position_monitor
+            position_monitor.start()
+        from watchlist_refresher import watchlist_refresher
+        watchlist_refresher.start()
+        self._update(status="running")
+        print(f"✅ HFT engine started (every {self.interval_seconds}s)")
+        return True
+
+    def stop(self):
+        """Stop after the current cycle finishes (no-op unless running here)"""
+        if not self.is_running():
+            return
+        self._stop.set()
+        self._wake.set()
+        if MONITOR_PARAMS["enabled"]:
+            from position_monitor import position_monitor
+            position_monitor.stop()
+        from watchlist_refresher import watchlist_refresher
+        watchlist_refresher.stop()
+        self._update(status="stopped", next_cycle_at=None)
+        print("⏹️ HFT engine stopped")
+
+    def trigger(self):
+        """Run a cycle now: wakes the loop, or runs one off-thread when stopped"""
+        if self.is_running():
+            self._wake.set()
+        elif remote_engine_state(self.state_file, self.heartbeat_seconds):
+            print("⚠️ HFT engine runs in another process; not starting a cycle here")
+        else:
+            threading.Thread(target=self.run_cycle, name="hft-engine-once", daemon=True).start()
+
+    def clear_history(self):
+        with self._lock:
+            self._cycles.clear()
+        self._write_state()
+
+    def _loop(self):
+        next_run = time.monotonic()
+        while not self._stop.is_set():
+            self.run_cycle()
+
+            next_run += self.interval_seconds
+            now = time.monotonic()
+            if next_run < now:
+                # Overran one or more slots; realign instead of catching up
+                next_run = now + self.interval_seconds - (now - next_run) % self.interval_seconds
+            with self._lock:
+                # Stopped mid-cycle: checked under the lock so stop() clearing
+                # next_cycle_at is never overwritten
+                if self._stop.is_set():
+                    break
+                self._state.update(next_cycle_at=time.time() + (next_run - now), updated_at=time.time())
+            self._write_state()
+
+            self._wake.wait(max(0.0, next_run - time.monotonic()))
+            if self._wake.is_set():
+                self._wake.clear()
+                next_run = time.monotonic()
+
+    def _control_loop(self):
+        """Heartbeat and commands from other processes, independent of cycles"""
+        last_beat = 0.0
+        while not self._stop.is_set():
+            if time.monotonic() - last_beat >= self.heartbeat_seconds:
+                self._update(heartbeat_at=time.time())
+                last_beat = time.monotonic()
+
+            command = self._take_command()
+            if command == "stop":
+                self.stop()
+            elif command == "trigger":
+                self._wake.set()
+            elif command == "clear_history":
+                self.clear_history()
+            self._stop.wait(0.5)
+
+    def _take_command(self):
+        """Pop a command addressed to this process from the command file"""
+        try:
+            with open(self.command_file) as f:
+                request = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if request.get("pid") != os.getpid():
+            return None
+        try:
+            os.remove(self.command_file)
+        except OSError:
+            pass
+        print(f"📨 HFT engine command: {request.get('command')}")
+        return request.get("command")
+
+    def run_cycle(self):
+        """Run one cycle and record its result (serialized across callers)"""
+        from automated_agent import run_hft_scalping_cycle, get_hft_stats
+
+        with self._cycle_lock:
+            start = time.perf_counter()
+            try:
+                result = run_hft_scalping_cycle()
+                error = result.get("error")
+            except Exception as e:
+                result = {"timestamp": datetime.now().isoformat(), "error": str(e)}
+                error = str(e)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            result["cycle_ms"] = elapsed_ms
+
+            try:
+                stats = get_hft_stats()
+                if MONITOR_PARAMS["enabled"]:
+                    from position_monitor import position_monitor
+                    stats["exit_latency"] = position_monitor.latency_stats()
+            except Exception as e:
+                stats = {"error": str(e)}
+
+            with self._lock:
+                self._cycles.appendleft(result)
+                self._state["cycles_run"] += 1
+            self._update(
+                last_cycle_at=result.get("timestamp"),
+                last_cycle_ms=elapsed_ms,
+                last_error=error,
+                stats=stats,
+            )
+            return result
+
+    def _update(self, **changes):
+        with self._lock:
+            self._state.update(changes)
+            self._state["updated_at"] = time.time()
+        self._write_state()
+
+    def snapshot(self):
+        """Copy of the engine state and recent cycles (newest first)"""
+        with self._lock:
+            state = dict(self._state)
+            state["cycles"] = list(self._cycles)
+        return state
+
+    def _write_state(self):
+        # Never overwrite the state of an engine running in another process
+        if not self.is_running() and remote_engine_state(self.state_file, self.heartbeat_seconds):
+            return
+        # Write-then-rename so readers never see a partial file
+        try:
+            with self._write_lock:
+                os.makedirs(os.path.dirname(self.state_file) or ".", exist_ok=True)
+                tmp_path = f"{self.state_file}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(self.snapshot(), f, default=str)
+                os.replace(tmp_path, self.state_file)
+        except Exception as e:
+            print(f"❌ Engine state write error: {e}")
+
+def read_engine_state(path=None):
+    """Engine state as last written to the state file (any process)"""
+    try:
+        with open(path or ENGINE_PARAMS["state_file"]) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def remote_engine_state(path=None, heartbeat_seconds=None):
+    """State file contents if another live process is running the engine, else None"""
+    state = read_engine_state(path)
+    heartbeat_seconds = heartbeat_seconds or ENGINE_PARAMS["heartbeat_seconds"]
+    if not state or state.get("status") != "running" or state.get("pid") == os.getpid():
+        return None
+    # A crashed engine leaves "running" behind; trust only a recent heartbeat
+    if time.time() - (state.get("heartbeat_at") or 0) > 3 * heartbeat_seconds:
+        return None
+    return state
+
+def send_engine_command(command, pid, path=None):
+    """Ask the engine running in process pid to run a control command"""
+    path = path or ENGINE_PARAMS["command_file"]
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"pid": pid, "command": command, "sent_at": time.time()}, f)
+    os.replace(tmp_path, path)
+
+engine = TradingEngine(
+    interval_seconds=TRADING_PARAMS["trade_frequency_mins"] * 60,
+    state_file=ENGINE_PARAMS["state_file"],
+    command_file=ENGINE_PARAMS["command_file"],
+    heartbeat_seconds=ENGINE_PARAMS["heartbeat_seconds"],
+    history=ENGINE_PARAMS["history"],
+)
+
+def control_engine(command):
+    """Run "stop", "trigger" or "clear_history" on the engine, in this
+    process or the one that owns it"""
+    remote = None if engine.is_running() else remote_engine_state()
+    if remote:
+        send_engine_command(command, remote["pid"])
+    else:
+        getattr(engine, command)()
+
+def get_engine_state():
+    """State of the engine running in another process, else of the in-process
+    engine if it has run here, else the state file as last written"""
+    remote = remote_engine_state()
+    if remote:
+        return remote
+    state = engine.snapshot()
+    if engine.is_running() or state["cycles_run"]:
+        return state
+    stored = read_engine_state()
+    if not stored:
+        return state
+    if stored.get("status") == "running":
+        # Its owner stopped heartbeating without shutting down cleanly
+        stored["status"] = "unresponsive"
+    return stored
+
+if __name__ == "__main__":
+    engine.start()
+    try:
+        while engine.is_running():
+            time.sleep(1)
+    except KeyboardInterrupt:
+        engine.stop()
@@ -0,0 +1,106 @@
+# watchlist_refresher.py
+import time
+import threading
+
+from momentum_scanner import momentum_scan, get_high_volume_stocks, get_stocks_in_news, combine_watchlist
+from fetch_engine import fetch_concurrently
+from trading_config import FETCH_PARAMS, WATCHLIST_PARAMS
+
+class WatchlistRefresher:
+    """Keeps the dynamic watchlist fresh in the background.
+
+    Price scans (momentum and volume) rerun every momentum_seconds and the
+    NewsAPI scan every news_seconds, each on its own schedule. A failing
+    scan is retried after retry_seconds, doubling with each consecutive
+    failure up to its normal interval, so a bad API key doesn't burn quota.
+    Cycles read the latest combined list and its age instead of scanning
+    themselves.
+    """
+
+    def __init__(self, momentum_seconds, news_seconds, retry_seconds):
+        self.momentum_seconds = momentum_seconds
+        self.news_seconds = news_seconds
+        self.retry_seconds = retry_seconds
+        self._results = {"momentum": [], "volume": [], "news": []}
+        self._refreshed = {"momentum": None, "volume": None, "news": None}  # monotonic times of the last successful scan
+        self._failed = {}  # job -> (monotonic time of its last failure, consecutive failures)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_running():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="watchlist-refresher", daemon=True)
+        self._thread.start()
+        print(f"✅ Watchlist refresher started (prices every {self.momentum_seconds}s, news every {self.news_seconds // 60:g}min)")
+
+    def stop(self):
+        self._stop.set()
+
+    def _due(self, key, every):
+        now = time.monotonic()
+        if key in self._failed:
+            failed_at, failures = self._failed[key]
+            return now - failed_at >= min(self.retry_seconds * 2 ** (failures - 1), every)
+        last = self._refreshed[key]
+        return last is None or now - last >= every
+
+    def _loop(self):
+        while not self._stop.is_set():
+            jobs = {}
+            if self._due("momentum", self.momentum_seconds):
+                jobs["momentum"] = lambda: momentum_scan(8)
+            if self._due("volume", self.momentum_seconds):
+                jobs["volume"] = lambda: get_high_volume_stocks(6)
+            if self._due("news", self.news_seconds):
+                jobs["news"] = lambda: get_stocks_in_news(6)
+            if jobs:
+                self.refresh(jobs)
+            self._stop.wait(1.0)
+
+    def refresh(self, jobs):
+        """Run scanner jobs in parallel and store whatever succeeded.
+
+        A job that fails or times out keeps its previous result and age, and
+        is retried with exponential backoff.
+        """
+        found, errors = fetch_concurrently(
+            lambda name: jobs[name](),
+            list(jobs),
+            max_workers=len(jobs),
+            timeout=FETCH_PARAMS["scan_timeout_seconds"]
+        )
+        for name, e in errors.items():
+            print(f"❌ Watchlist {name} scan failed: {e}")
+
+        now = time.monotonic()
+        with self._lock:
+            for name, result in found.items():
+                self._results[name] = result
+                self._refreshed[name] = now
+                self._failed.pop(name, None)
+            for name in errors:
+                failures = self._failed.get(name, (None, 0))[1] + 1
+                self._failed[name] = (now, failures)
+
+    def latest(self):
+        """(watchlist, age_seconds) where age is that of the older price scan;
+        ([], None) until both price scans have succeeded once"""
+        with self._lock:
+            price_scans = [self._refreshed["momentum"], self._refreshed["volume"]]
+            if None in price_scans:
+                return [], None
+            watchlist = combine_watchlist(self._results["momentum"], self._results["volume"], self._results["news"])
+            age = time.monotonic() - min(price_scans)
+        return watchlist, age
+
+watchlist_refresher = WatchlistRefresher(
+    momentum_seconds=WATCHLIST_PARAMS["momentum_refresh_seconds"],
+    news_seconds=WATCHLIST_PARAMS["news_refresh_minutes"] * 60,
+    retry_seconds=WATCHLIST_PARAMS["retry_seconds"],
+)